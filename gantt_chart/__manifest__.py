@@ -13,30 +13,34 @@
     """,
     'author': 'Rakesh ASD',
     'website': 'https://asdsoftwares.com',
-    'depends': ['base', 'web', 'project', 'mail'],
+    'depends': ['base', 'web', 'project', 'mail', 'resource', 'bus'],
+    'external_dependencies': {
+        'python': ['numpy', 'xlsxwriter'],
+    },
     'data': [
         'security/ir.model.access.csv',
         'views/gantt_actions.xml',
         'views/gantt_task_views.xml',
         'views/gantt_menu.xml',
-        'views/project_wizard_view.xml'
+        'views/project_wizard_view.xml',
+        'views/gantt_baseline_views.xml',
+        'views/gantt_job_views.xml',
+        'views/gantt_wbs_move_views.xml',
+        'views/gantt_project_clone_views.xml',
+        'views/gantt_bulk_export_views.xml',
+        'data/gantt_job_data.xml',
+        'data/gantt_rollup_data.xml',
+        'data/gantt_progress_history_data.xml',
 
     ],
     'assets': {
+        # Only the action code and templates ship with every backend page.
+        # Frappe Gantt and its CSS are loaded by the actions (jsLibs/cssLibs)
+        # and ExcelJS (from its CDN) when an export first runs.
         'web.assets_backend': [
-            'gantt_chart/static/src/lib/frappe-gantt.css',
-            'gantt_chart/static/src/lib/frappe-gantt.min.js',
             'gantt_chart/static/src/js/frappe_gantt_widget.js',
             'gantt_chart/static/src/js/combined_gantt_widget.js',
-            'gantt_chart/static/src/css/combined_gantt.css',
             'gantt_chart/static/src/xml/gantt_templates.xml',
-            'https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js',
-            'https://cdnjs.cloudflare.com/ajax/libs/xlsx/0.18.5/xlsx.full.min.js',
-            'https://cdnjs.cloudflare.com/ajax/libs/jspdf/2.5.1/jspdf.umd.min.js',
-            'https://cdnjs.cloudflare.com/ajax/libs/jszip/3.10.1/jszip.min.js',
-            'https://cdnjs.cloudflare.com/ajax/libs/FileSaver.js/2.0.5/FileSaver.min.js',
-            'https://cdnjs.cloudflare.com/ajax/libs/exceljs/4.3.0/exceljs.min.js',
-
         ],
     },
     'installable': True,
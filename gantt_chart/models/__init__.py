@@ -1,2 +1,15 @@
 from . import gantt_task
-from. import project_wizard_model
\ No newline at end of file
+from. import project_wizard_model
+from . import gantt_baseline
+from . import gantt_earned_value
+from . import gantt_working_calendar
+from . import gantt_portfolio
+from . import gantt_job
+from . import gantt_wbs_move
+from . import gantt_rollup
+from . import gantt_project_clone
+from . import gantt_filters
+from . import gantt_sandbox
+from . import gantt_risk
+from . import gantt_progress_history
+from . import gantt_bulk_export
@@ -0,0 +1,73 @@
+"""
+Workbook rendering for the server-side project export. Functions here only
+take plain values, so they can run in worker processes.
+"""
+from datetime import timedelta
+from io import BytesIO
+
+import xlsxwriter
+
+EXPORT_HEADERS = ['Project Name', 'Start Date', 'End Date', 'WBS', 'Task', 'Lead',
+                  'Start', 'End', 'Days', '% Done', 'Duration', '']
+EXPORT_WIDTHS = [15, 12, 12, 8, 25, 15, 12, 12, 8, 10, 10, 2]
+
+
+def project_filename(wbs_root):
+    return f'Project_{wbs_root}_GanttChart.xlsx'
+
+
+def build_project_workbook(wbs_root, tasks):
+    """
+    Renders one project as the Gantt workbook of the browser export: a task
+    table followed by one column per day, filled green while the task runs.
+    ``tasks`` are dicts with wbs, name, lead, start_date, end_date (dates),
+    duration and progress, in WBS order. Returns the .xlsx content.
+    """
+    starts = [task['start_date'] for task in tasks if task['start_date']]
+    ends = [task['end_date'] for task in tasks if task['end_date']]
+    project_start = min(starts) if starts else None
+    project_end = max(ends) if ends else None
+    days = [project_start + timedelta(days=offset) for offset in range((project_end - project_start).days + 1)] \
+        if project_start and project_end and project_end >= project_start else []
+
+    output = BytesIO()
+    # Rows are written in order and flushed as they are done, whatever the project size
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    sheet = workbook.add_worksheet('Project Gantt Chart')
+    header = workbook.add_format({'bold': True, 'font_color': '#FFFFFF', 'bg_color': '#4A90E2'})
+    fill = workbook.add_format({'bg_color': '#77A651'})
+
+    for column, width in enumerate(EXPORT_WIDTHS + [3] * len(days)):
+        sheet.set_column(column, column, width)
+    sheet.freeze_panes(1, 0)
+    sheet.write_row(0, 0, EXPORT_HEADERS + [day.strftime('%d/%m') for day in days], header)
+
+    row = 1
+    first_day_column = len(EXPORT_HEADERS)
+    for index, task in enumerate(tasks):
+        start, end = task['start_date'], task['end_date']
+        sheet.set_row(row, 20)
+        sheet.write_row(row, 0, [
+            f'Project {wbs_root}',
+            str(start or project_start or ''),
+            str(end or project_end or ''),
+            task['wbs'],
+            task['name'],
+            task['lead'] or '',
+            str(start or ''),
+            str(end or ''),
+            task['duration'] or '',
+            f"{task['progress'] or 0}%",
+            task['duration'] or '',
+        ])
+        if start and end and days:
+            for offset in range(max((start - project_start).days, 0), min((end - project_start).days, len(days) - 1) + 1):
+                sheet.write_blank(row, first_day_column + offset, None, fill)
+        row += 1
+        # Small gap row between tasks
+        if index < len(tasks) - 1:
+            sheet.set_row(row, 5)
+            row += 1
+
+    workbook.close()
+    return output.getvalue()
@@ -0,0 +1,206 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from datetime import timedelta
+import base64
+import logging
+import zlib
+
+import numpy as np
+
+from .schedule_tools import EPOCH
+
+_logger = logging.getLogger(__name__)
+
+# One packed row per task: id, start and end as days since 1970-01-01, progress
+BASELINE_DTYPE = np.dtype([
+    ('id', '<i4'),
+    ('start', '<i4'),
+    ('end', '<i4'),
+    ('progress', '<f4'),
+])
+
+
+class GanttTask(models.Model):
+    _inherit = 'gantt.task'
+
+    @api.model
+    def _read_schedule_arrays(self, wbs_root):
+        """
+        Loads id, start, end and progress of every task under a WBS root into
+        a packed NumPy array sorted by id. Dates are expressed as day numbers
+        since 1970-01-01 so they can be compared with plain integer maths.
+        """
+        self.flush_model(['wbs', 'start_date', 'end_date', 'progress'])
+        self.env.cr.execute("""
+            SELECT id,
+                   start_date - DATE '1970-01-01',
+                   end_date - DATE '1970-01-01',
+                   COALESCE(progress, 0)
+              FROM gantt_task
+             WHERE (wbs = %s OR wbs LIKE %s)
+               AND start_date IS NOT NULL
+               AND end_date IS NOT NULL
+             ORDER BY id
+        """, (wbs_root, f'{wbs_root}.%'))
+        return np.array(self.env.cr.fetchall(), dtype=BASELINE_DTYPE)
+
+    def action_create_baseline(self):
+        """Snapshot the schedule of this task's project as a new baseline"""
+        self.ensure_one()
+        wbs_root = self.wbs.split('.')[0] if self.wbs else '1'
+        baseline = self.env['gantt.baseline'].create_from_schedule(wbs_root)
+        return {
+            'name': 'Baseline',
+            'type': 'ir.actions.act_window',
+            'res_model': 'gantt.baseline',
+            'res_id': baseline.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
+
+
+class GanttBaseline(models.Model):
+    _name = 'gantt.baseline'
+    _description = 'Gantt Schedule Baseline'
+    _order = 'wbs_root, snapshot_date desc'
+
+    name = fields.Char('Name', required=True)
+    wbs_root = fields.Char('WBS Root', required=True, index=True)
+    project_id = fields.Many2one('project.project', string='Project')
+    snapshot_date = fields.Datetime('Snapshot Date', default=fields.Datetime.now, readonly=True)
+    task_count = fields.Integer('Tasks', readonly=True)
+    baseline_start = fields.Date('Baseline Start', readonly=True)
+    baseline_end = fields.Date('Baseline Finish', readonly=True)
+    # Compressed BASELINE_DTYPE rows, one per task
+    data = fields.Binary('Snapshot Data', attachment=False, readonly=True)
+
+    finish_slippage = fields.Integer('Finish Slippage (Days)', compute='_compute_variance_summary',
+                                     help="Days the project finish moved compared to this baseline")
+    late_task_count = fields.Integer('Late Tasks', compute='_compute_variance_summary')
+    early_task_count = fields.Integer('Early Tasks', compute='_compute_variance_summary')
+    average_finish_variance = fields.Float('Avg. Finish Variance (Days)', compute='_compute_variance_summary')
+
+    @api.model
+    def create_from_schedule(self, wbs_root, name=None):
+        rows = self.env['gantt.task']._read_schedule_arrays(wbs_root)
+        if not len(rows):
+            raise UserError(f"No scheduled tasks found for project {wbs_root}.")
+
+        root_task = self.env['gantt.task'].search([('wbs', '=', wbs_root)], limit=1)
+        baseline = self.create({
+            'name': name or f'Baseline {fields.Date.today()}',
+            'wbs_root': wbs_root,
+            'project_id': root_task.project_id.id,
+            'task_count': len(rows),
+            'baseline_start': self._day_to_date(rows['start'].min()),
+            'baseline_end': self._day_to_date(rows['end'].max()),
+            'data': base64.b64encode(zlib.compress(rows.tobytes())),
+        })
+        _logger.info(f"Created baseline {baseline.id} for WBS root {wbs_root} with {len(rows)} tasks")
+        return baseline
+
+    @api.model
+    def _day_to_date(self, day):
+        return EPOCH + timedelta(days=int(day))
+
+    def _get_rows(self):
+        self.ensure_one()
+        if not self.data:
+            return np.zeros(0, dtype=BASELINE_DTYPE)
+        return np.frombuffer(zlib.decompress(base64.b64decode(self.data)), dtype=BASELINE_DTYPE)
+
+    def _compare_with_current(self, current=None):
+        """
+        Aligns the baseline with the current schedule by task id and returns
+        the matching rows of both, plus ids that were added or removed since.
+        Both arrays are sorted by id, so the join is a single intersect.
+        ``current`` can be passed when the schedule arrays are already loaded.
+        """
+        self.ensure_one()
+        baseline = self._get_rows()
+        if current is None:
+            current = self.env['gantt.task']._read_schedule_arrays(self.wbs_root)
+        common, base_idx, cur_idx = np.intersect1d(
+            baseline['id'], current['id'], assume_unique=True, return_indices=True)
+        return {
+            'baseline': baseline,
+            'current': current,
+            'ids': common,
+            'base': baseline[base_idx],
+            'cur': current[cur_idx],
+            'added': np.setdiff1d(current['id'], baseline['id'], assume_unique=True),
+            'removed': np.setdiff1d(baseline['id'], current['id'], assume_unique=True),
+        }
+
+    @api.depends('data', 'wbs_root')
+    def _compute_variance_summary(self):
+        # Baselines of the same project share one read of the live schedule
+        currents = {}
+        for baseline in self:
+            summary = {}
+            if baseline.data:
+                if baseline.wbs_root not in currents:
+                    currents[baseline.wbs_root] = self.env['gantt.task']._read_schedule_arrays(baseline.wbs_root)
+                summary = baseline._get_variance(include_tasks=False, current=currents[baseline.wbs_root])
+            baseline.finish_slippage = summary.get('finish_slippage', 0)
+            baseline.late_task_count = summary.get('late_tasks', 0)
+            baseline.early_task_count = summary.get('early_tasks', 0)
+            baseline.average_finish_variance = summary.get('average_finish_variance', 0.0)
+
+    def get_variance(self, include_tasks=True):
+        """
+        Returns start/finish variance and slippage of the current plan against
+        this baseline. Positive values mean later than planned.
+        """
+        return self._get_variance(include_tasks)
+
+    def _get_variance(self, include_tasks=True, current=None):
+        self.ensure_one()
+        cmp = self._compare_with_current(current)
+        base, cur = cmp['base'], cmp['cur']
+
+        start_variance = cur['start'] - base['start']
+        finish_variance = cur['end'] - base['end']
+        progress_variance = cur['progress'] - base['progress']
+
+        baseline_finish = int(cmp['baseline']['end'].max()) if len(cmp['baseline']) else 0
+        current_finish = int(cmp['current']['end'].max()) if len(cmp['current']) else baseline_finish
+
+        result = {
+            'baseline_id': self.id,
+            'wbs_root': self.wbs_root,
+            'compared_tasks': int(len(cmp['ids'])),
+            'added_tasks': cmp['added'].tolist(),
+            'removed_tasks': cmp['removed'].tolist(),
+            'finish_slippage': current_finish - baseline_finish,
+            'late_tasks': int(np.count_nonzero(finish_variance > 0)),
+            'early_tasks': int(np.count_nonzero(finish_variance < 0)),
+            'average_start_variance': float(start_variance.mean()) if len(start_variance) else 0.0,
+            'average_finish_variance': float(finish_variance.mean()) if len(finish_variance) else 0.0,
+            'max_finish_variance': int(finish_variance.max()) if len(finish_variance) else 0,
+        }
+
+        if include_tasks:
+            changed = (start_variance != 0) | (finish_variance != 0) | (progress_variance != 0)
+            result['tasks'] = [
+                {
+                    'id': int(task_id),
+                    'start_variance': int(sv),
+                    'finish_variance': int(fv),
+                    'progress_variance': round(float(pv), 2),
+                }
+                for task_id, sv, fv, pv in zip(cmp['ids'][changed], start_variance[changed],
+                                               finish_variance[changed], progress_variance[changed])
+            ]
+        return result
+
+    @api.model
+    def get_project_variance(self, wbs_root, baseline_id=None):
+        """Variance of a project against the given or most recent baseline"""
+        domain = [('wbs_root', '=', wbs_root)]
+        if baseline_id:
+            domain.append(('id', '=', baseline_id))
+        baseline = self.search(domain, order='snapshot_date desc', limit=1)
+        if not baseline:
+            return {}
+        return baseline.get_variance()
@@ -0,0 +1,158 @@
+from odoo import models, fields, api, tools
+from odoo.exceptions import UserError
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import logging
+import multiprocessing
+import os
+import zipfile
+
+from .export_tools import build_project_workbook, project_filename
+
+_logger = logging.getLogger(__name__)
+
+# Projects exported per job chunk, the job progress moves once per chunk
+EXPORT_CHUNK_SIZE = 10
+# Worker processes rendering workbooks, 1 renders in the job's own process
+EXPORT_WORKERS = 1
+# Upper bound on the worker processes, whatever EXPORT_WORKERS asks for
+EXPORT_MAX_WORKERS = 4
+# Workbooks queued or waiting to be written per worker, bounds the memory used
+EXPORT_IN_FLIGHT_PER_WORKER = 2
+
+
+class GanttTask(models.Model):
+    _inherit = 'gantt.task'
+
+    @api.model
+    def export_projects(self, wbs_roots):
+        """
+        Exports the Gantt workbook of every given project into one ZIP file,
+        as a background job. The archive is attached to the job when done.
+        """
+        wbs_roots = sorted({root for root in wbs_roots or [] if root})
+        if not wbs_roots:
+            raise UserError("Select at least one project to export.")
+        self.check_access_rights('read')
+        job = self.env['gantt.job'].enqueue_items(
+            f'Export {len(wbs_roots)} projects', 'gantt.task', '_export_projects_chunk', wbs_roots,
+            chunk_size=EXPORT_CHUNK_SIZE)
+        return job.action_notify_queued()
+
+    def action_export_projects(self):
+        """Exports the projects of the selected tasks"""
+        return self.export_projects(self.mapped('wbs_root'))
+
+    @api.model
+    def _export_path(self, job):
+        # Next to the filestore, in the data directory shared by the servers running the jobs
+        directory = os.path.join(tools.config['data_dir'], 'gantt_export', self.env.cr.dbname)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f'job_{job.id}.zip')
+
+    @api.model
+    def _read_export_tasks(self, wbs_root):
+        tasks = self.search_read(
+            ['|', ('wbs', '=', wbs_root), ('wbs', '=like', f'{wbs_root}.%')],
+            ['wbs', 'name', 'lead', 'start_date', 'end_date', 'duration', 'progress'])
+        for task in tasks:
+            task['lead'] = task['lead'][1] if task['lead'] else ''
+        return tasks
+
+    @api.model
+    def _export_projects_chunk(self, wbs_roots):
+        """
+        Job chunk: renders these projects' workbooks, in this process unless
+        EXPORT_WORKERS asks for a pool, and appends them to the job's ZIP
+        file, which stays on disk between chunks. The last chunk stores the
+        archive as the job's attachment.
+        """
+        job = self.env['gantt.job'].browse(self.env.context.get('gantt_job_id'))
+        if not job:
+            raise UserError("Project exports run as background jobs, use export_projects().")
+        path = self._export_path(job)
+
+        with zipfile.ZipFile(path, 'a') as archive:
+            # A retried chunk skips the workbooks it already wrote
+            written = set(archive.namelist())
+            todo = [root for root in wbs_roots if project_filename(root) not in written]
+            workers = min(EXPORT_WORKERS, EXPORT_MAX_WORKERS, len(todo))
+            if workers > 1 and self._export_in_pool(archive, todo, workers):
+                todo = []
+            for root in todo:
+                if project_filename(root) not in archive.namelist():
+                    self._write_export(archive, root, build_project_workbook(root, self._read_export_tasks(root)))
+
+        if job.done_count + len(wbs_roots) >= job.total_count:
+            # Jobs are read-only for their users, the runner's bookkeeping goes through sudo
+            job.sudo().attachment_id = self._store_export(path, job)
+
+    @api.model
+    def _store_export(self, path, job):
+        """
+        Attaches the finished archive to the job. The temporary archive is
+        removed once the transaction is committed, so a failed commit can
+        retry.
+        """
+        with open(path, 'rb') as archive_file:
+            attachment = self.env['ir.attachment'].sudo().create({
+                'name': f'Gantt_Export_{fields.Date.context_today(self)}.zip',
+                'mimetype': 'application/zip',
+                'res_model': 'gantt.job',
+                'res_id': job.id,
+                'raw': archive_file.read(),
+            })
+        self._remove_after_commit(path)
+        return attachment
+
+    @api.model
+    def _discard_export(self, job):
+        """
+        Removes the partial archive of a failed or cancelled export, a retry
+        rebuilds it. Cancelling waits for the lock of the chunk in progress,
+        and the file is only removed once the cancellation is committed, so
+        no chunk is still appending to it.
+        """
+        self._remove_after_commit(self._export_path(job))
+        job.sudo().done_count = 0
+
+    @api.model
+    def _remove_after_commit(self, path):
+        self.env.cr.postcommit.add(lambda: os.path.exists(path) and os.remove(path))
+
+    @api.model
+    def _export_in_pool(self, archive, wbs_roots, workers):
+        """
+        Renders the workbooks in worker processes started by a fork server,
+        never forked from the cron worker with its cursor and locks, which
+        only receive plain task values. Returns False when the pool cannot
+        run, the caller then renders the remaining projects itself.
+        """
+        queue = iter(wbs_roots)
+        pending = {}
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('forkserver')) \
+                    as executor:
+                def submit_next():
+                    root = next(queue, None)
+                    if root is not None:
+                        pending[executor.submit(build_project_workbook, root, self._read_export_tasks(root))] = root
+
+                for _index in range(workers * EXPORT_IN_FLIGHT_PER_WORKER):
+                    submit_next()
+                while pending:
+                    done, _not_done = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        root = pending.pop(future)
+                        self._write_export(archive, root, future.result())
+                        submit_next()
+        except (BrokenProcessPool, OSError) as error:
+            _logger.warning(f"Export worker pool unavailable, rendering in process: {error}")
+            return False
+        return True
+
+    @api.model
+    def _write_export(self, archive, wbs_root, content):
+        # Workbooks are compressed already
+        archive.writestr(project_filename(wbs_root), content, compress_type=zipfile.ZIP_STORED)
+        _logger.info(f"Exported Gantt workbook of project {wbs_root} ({len(content)} bytes)")
@@ -0,0 +1,145 @@
+from odoo import models, fields, api
+from datetime import timedelta
+import logging
+
+import numpy as np
+
+from .schedule_tools import EPOCH, count_working_days, cumulative_work
+
+_logger = logging.getLogger(__name__)
+
+EARNED_VALUE_INTERVALS = {'day': 1, 'week': 7}
+
+
+class GanttTask(models.Model):
+    _inherit = 'gantt.task'
+
+    @api.model
+    def _read_leaf_schedule(self, wbs_roots=None):
+        """
+        Loads the schedule of every leaf task, optionally limited to some WBS
+        roots. Summary tasks are skipped so their span is not counted on top
+        of their children. Returns the sorted list of roots and arrays of
+        root index, start day, end day (days since 1970-01-01), progress and
+        calendar id (0 without one).
+        """
+        self.flush_model(['wbs', 'start_date', 'end_date', 'progress', 'calendar_id'])
+        query = """
+            SELECT split_part(wbs, '.', 1),
+                   wbs,
+                   start_date - DATE '1970-01-01',
+                   end_date - DATE '1970-01-01',
+                   COALESCE(progress, 0),
+                   COALESCE(calendar_id, 0)
+              FROM gantt_task
+             WHERE start_date IS NOT NULL
+               AND end_date IS NOT NULL
+               AND end_date >= start_date
+        """
+        params = []
+        if wbs_roots:
+            query += " AND split_part(wbs, '.', 1) = ANY(%s)"
+            params.append(list(wbs_roots))
+        self.env.cr.execute(query, params)
+        rows = self.env.cr.fetchall()
+
+        parents = set()
+        for row in rows:
+            parts = row[1].split('.')
+            for depth in range(1, len(parts)):
+                parents.add('.'.join(parts[:depth]))
+        leaves = [row for row in rows if row[1] not in parents]
+
+        roots = sorted({row[0] for row in leaves}, key=lambda r: (not r.isdigit(), int(r) if r.isdigit() else 0, r))
+        root_index = {root: index for index, root in enumerate(roots)}
+        return (
+            roots,
+            np.array([root_index[row[0]] for row in leaves], dtype=np.int64),
+            np.array([row[2] for row in leaves], dtype=np.int64),
+            np.array([row[3] for row in leaves], dtype=np.int64),
+            np.array([row[4] for row in leaves], dtype=np.float64),
+            np.array([row[5] for row in leaves], dtype=np.int64),
+        )
+
+    @api.model
+    def get_earned_value(self, wbs_roots=None, interval='day', status_date=None):
+        """
+        Returns planned value, earned value and SPI for one or more WBS roots.
+        Pass a single root, a list of roots, or nothing for the whole portfolio.
+
+        Task durations in working days of each task's calendar are the
+        weights, so planned value at a date is the number of working task-days
+        scheduled up to that date. It is only evaluated at the sampled dates
+        and the status date (see cumulative_work), so a stray far-off date
+        lengthens the series but allocates nothing per day in between.
+        Earned value is measured at the status date from current progress.
+        """
+        if isinstance(wbs_roots, str):
+            wbs_roots = [wbs_roots]
+        step = EARNED_VALUE_INTERVALS.get(interval, 1)
+        status = fields.Date.to_date(status_date) or fields.Date.context_today(self)
+        status_day = (status - EPOCH).days
+
+        roots, root_idx, starts, ends, progress, calendars = self._read_leaf_schedule(wbs_roots)
+        result = {
+            'interval': interval,
+            'status_date': fields.Date.to_string(status),
+            'dates': [],
+            'projects': {},
+            'portfolio': {},
+        }
+        if not roots:
+            return result
+
+        first_day = int(starts.min())
+        n_days = int(ends.max()) - first_day + 1
+        n_roots = len(roots)
+        # Same working days as the stored task durations, calendar days without a calendar
+        prefixes = {calendar_id: self.env['resource.calendar'].browse(calendar_id)._get_workday_prefix_sums()
+                    if calendar_id else None
+                    for calendar_id in np.unique(calendars).tolist()}
+        durations = (ends - starts + 1).astype(np.float64)
+        for calendar_id, prefix in prefixes.items():
+            if prefix is not None:
+                mask = calendars == calendar_id
+                durations[mask] = count_working_days(prefix, starts[mask], ends[mask])
+
+        budget = np.bincount(root_idx, weights=durations, minlength=n_roots)
+        earned = np.bincount(root_idx, weights=durations * progress / 100.0, minlength=n_roots)
+
+        # Sample the curve on the requested grid, always keeping the last day
+        grid = np.arange(step - 1, n_days, step)
+        if not len(grid) or grid[-1] != n_days - 1:
+            grid = np.append(grid, n_days - 1)
+        result['dates'] = [fields.Date.to_string(EPOCH + timedelta(days=first_day + int(offset))) for offset in grid]
+        days = np.append(first_day + grid, status_day)
+
+        # One group of tasks per root and calendar, roots in order
+        order = np.lexsort((calendars, root_idx))
+        bounds = np.flatnonzero((np.diff(root_idx[order]) != 0) | (np.diff(calendars[order]) != 0)) + 1
+        planned = np.zeros(len(days))
+        portfolio = np.zeros(len(days))
+        groups = np.split(order, bounds)
+        for position, group in enumerate(groups):
+            index = int(root_idx[group[0]])
+            planned += cumulative_work(prefixes[int(calendars[group[0]])], starts[group], ends[group], days)
+            if position + 1 == len(groups) or root_idx[groups[position + 1][0]] != index:
+                portfolio += planned
+                result['projects'][roots[index]] = self._format_earned_value(
+                    planned[:-1], budget[index], earned[index], planned[-1])
+                planned = np.zeros(len(days))
+        result['portfolio'] = self._format_earned_value(
+            portfolio[:-1], budget.sum(), earned.sum(), portfolio[-1])
+        return result
+
+    @api.model
+    def _format_earned_value(self, planned_series, budget, earned, planned_at_status):
+        budget = float(budget)
+        return {
+            'budget': budget,
+            'planned_value': round(float(planned_at_status), 2),
+            'earned_value': round(float(earned), 2),
+            'spi': round(float(earned / planned_at_status), 3) if planned_at_status else None,
+            'pv': np.round(planned_series, 2).tolist(),
+            'pv_percent': np.round(planned_series * 100.0 / budget, 2).tolist() if budget else [],
+        }
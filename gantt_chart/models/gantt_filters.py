@@ -0,0 +1,184 @@
+from odoo import models, api
+from odoo.osv import expression
+import logging
+
+_logger = logging.getLogger(__name__)
+
+PROGRESS_BUCKETS = [
+    ('not_started', 'Not Started'),
+    ('in_progress', 'In Progress'),
+    ('done', 'Done'),
+]
+PROGRESS_BUCKET_DOMAINS = {
+    'not_started': [('progress', '<=', 0)],
+    'in_progress': [('progress', '>', 0), ('progress', '<', 100)],
+    'done': [('progress', '>=', 100)],
+}
+PROGRESS_BUCKET_SQL = """
+    CASE WHEN COALESCE("gantt_task"."progress", 0) >= 100 THEN 'done'
+         WHEN COALESCE("gantt_task"."progress", 0) > 0 THEN 'in_progress'
+         ELSE 'not_started' END
+"""
+
+
+class GanttTask(models.Model):
+    _inherit = 'gantt.task'
+
+    @api.model
+    def _gantt_scope_domain(self, wbs_root=None, filters=None):
+        """
+        Part of the filters that defines which tasks are looked at: project,
+        WBS branch and name search. Facets are counted inside this scope.
+        """
+        filters = filters or {}
+        domain = []
+        for prefix in (wbs_root, filters.get('wbs_prefix')):
+            if prefix:
+                domain = expression.AND([domain, ['|', ('wbs', '=', prefix), ('wbs', '=like', f'{prefix}.%')]])
+        if filters.get('search'):
+            # Served by the trigram index on name
+            domain = expression.AND([domain, [('name', 'ilike', filters['search'].strip())]])
+        return domain
+
+    @api.model
+    def _gantt_filter_domain(self, filters):
+        """
+        Domain of the structured Gantt filters, all optional:
+        ``lead_ids`` (0 or False for unassigned), ``priority`` (list),
+        ``delayed`` (bool), ``progress_bucket`` (list of PROGRESS_BUCKETS),
+        ``wbs_prefix`` and ``search``.
+        """
+        filters = filters or {}
+        domains = [self._gantt_scope_domain(filters=filters)]
+        lead_ids = filters.get('lead_ids')
+        if lead_ids:
+            ids = [int(lead_id) for lead_id in lead_ids if lead_id]
+            lead_domain = [('lead', 'in', ids)] if ids else expression.FALSE_DOMAIN
+            if len(ids) < len(lead_ids):
+                lead_domain = expression.OR([lead_domain, [('lead', '=', False)]])
+            domains.append(lead_domain)
+        if filters.get('priority'):
+            domains.append([('priority', 'in', list(filters['priority']))])
+        if filters.get('delayed') is not None:
+            domains.append([('is_delayed', '=', bool(filters['delayed']))])
+        buckets = [bucket for bucket in filters.get('progress_bucket') or [] if bucket in PROGRESS_BUCKET_DOMAINS]
+        if buckets:
+            domains.append(expression.OR([PROGRESS_BUCKET_DOMAINS[bucket] for bucket in buckets]))
+        return expression.AND(domains)
+
+    def _get_filter_ancestors(self, scope_domain):
+        """Ancestors of these tasks that are not in the recordset, so filtered trees stay readable"""
+        known = set(self.mapped('wbs'))
+        missing = set()
+        for wbs in known:
+            parts = wbs.split('.')
+            missing.update('.'.join(parts[:depth]) for depth in range(1, len(parts)))
+        missing -= known
+        if not missing:
+            return self.browse()
+        return self.search(expression.AND([scope_domain, [('wbs', 'in', list(missing))]]))
+
+    @api.model
+    def _gantt_facet_conditions(self, filters):
+        """SQL conditions matching each facet dimension's filter, TRUE when unfiltered"""
+        filters = filters or {}
+        conditions = {}
+        lead_ids = filters.get('lead_ids')
+        if lead_ids:
+            ids = [int(lead_id) for lead_id in lead_ids if lead_id]
+            conditions['lead'] = ('("gantt_task"."lead" = ANY(%s) OR (%s AND "gantt_task"."lead" IS NULL))',
+                                  [ids, len(ids) < len(lead_ids)])
+        if filters.get('priority'):
+            conditions['priority'] = ('"gantt_task"."priority" = ANY(%s)', [list(filters['priority'])])
+        if filters.get('delayed') is not None:
+            conditions['delayed'] = ('COALESCE("gantt_task"."is_delayed", false) = %s', [bool(filters['delayed'])])
+        if filters.get('progress_bucket'):
+            conditions['bucket'] = (f'({PROGRESS_BUCKET_SQL}) = ANY(%s)', [list(filters['progress_bucket'])])
+        return conditions
+
+    @api.model
+    def get_gantt_facets(self, wbs_root=None, filters=None):
+        """
+        Counts per assignee, priority, delayed flag and progress bucket for
+        the Gantt filter bar, in one scan of the scoped tasks. Each dimension
+        is counted with the other dimensions' filters applied but not its
+        own, so every option shows how many tasks selecting it would give.
+        """
+        self.check_access_rights('read')
+        self.flush_model(['wbs', 'name', 'lead', 'priority', 'is_delayed', 'progress'])
+        query = self._where_calc(self._gantt_scope_domain(wbs_root, filters))
+        self._apply_ir_rules(query, 'read')
+        from_clause, where_clause, where_params = query.get_sql()
+
+        conditions = self._gantt_facet_conditions(filters)
+        select_params = []
+        matches = {}
+        for dimension in ('lead', 'priority', 'delayed', 'bucket'):
+            sql, params = conditions.get(dimension, ('TRUE', []))
+            matches[dimension] = sql
+            select_params += params
+
+        self.env.cr.execute(f"""
+            WITH scoped AS (
+                SELECT "gantt_task"."lead" AS lead,
+                       "gantt_task"."priority" AS priority,
+                       COALESCE("gantt_task"."is_delayed", false) AS delayed,
+                       {PROGRESS_BUCKET_SQL} AS bucket,
+                       {matches['lead']} AS m_lead,
+                       {matches['priority']} AS m_priority,
+                       {matches['delayed']} AS m_delayed,
+                       {matches['bucket']} AS m_bucket
+                  FROM {from_clause}
+                 WHERE {where_clause or 'TRUE'}
+            )
+            SELECT 'lead', lead::text, COUNT(*) FILTER (WHERE m_priority AND m_delayed AND m_bucket)
+              FROM scoped GROUP BY lead
+            UNION ALL
+            SELECT 'priority', priority, COUNT(*) FILTER (WHERE m_lead AND m_delayed AND m_bucket)
+              FROM scoped GROUP BY priority
+            UNION ALL
+            SELECT 'delayed', delayed::text, COUNT(*) FILTER (WHERE m_lead AND m_priority AND m_bucket)
+              FROM scoped GROUP BY delayed
+            UNION ALL
+            SELECT 'progress_bucket', bucket, COUNT(*) FILTER (WHERE m_lead AND m_priority AND m_delayed)
+              FROM scoped GROUP BY bucket
+            UNION ALL
+            SELECT 'total', NULL, COUNT(*) FILTER (WHERE m_lead AND m_priority AND m_delayed AND m_bucket)
+              FROM scoped
+        """, select_params + where_params)
+
+        counts = {'lead': {}, 'priority': {}, 'delayed': {}, 'progress_bucket': {}, 'total': {}}
+        for facet, value, count in self.env.cr.fetchall():
+            counts[facet][value] = count
+
+        users = self.env['res.users'].browse([int(value) for value in counts['lead'] if value])
+        user_names = {user.id: user.name for user in users}
+        facets = {
+            'total': counts['total'].get(None, 0),
+            'lead': [
+                {'id': int(value) if value else False,
+                 'name': user_names.get(int(value), '') if value else 'Unassigned',
+                 'count': count}
+                for value, count in counts['lead'].items()
+            ],
+            'priority': [
+                {'value': value, 'label': label, 'count': counts['priority'].get(value, 0)}
+                for value, label in self._fields['priority'].selection
+            ],
+            'delayed': [
+                {'value': True, 'label': 'Delayed', 'count': counts['delayed'].get('true', 0)},
+                {'value': False, 'label': 'On Time', 'count': counts['delayed'].get('false', 0)},
+            ],
+            'progress_bucket': [
+                {'value': value, 'label': label, 'count': counts['progress_bucket'].get(value, 0)}
+                for value, label in PROGRESS_BUCKETS
+            ],
+        }
+        facets['lead'].sort(key=lambda lead: (-lead['count'], lead['name']))
+        return facets
+
+    @api.model
+    def _count_filter_matches_by_root(self, filters):
+        """Number of tasks matching the filters per WBS root, for the portfolio catalog"""
+        groups = self.read_group(self._gantt_filter_domain(filters), ['wbs_root'], ['wbs_root'], lazy=False)
+        return {group['wbs_root']: group['__count'] for group in groups if group['wbs_root']}
@@ -0,0 +1,253 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+import json
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Records processed between two commits
+JOB_CHUNK_SIZE = 500
+# Seconds a cron run keeps working before handing over to the next run
+JOB_TIME_BUDGET = 120
+# Above this many records, interactive actions run as a background job
+JOB_THRESHOLD = 2000
+# Methods a job may run, jobs run as their user from a superuser cron
+JOB_METHODS = {
+    ('gantt.task', '_link_to_project'),
+    ('gantt.task', '_apply_task_values'),
+    ('gantt.task', '_export_projects_chunk'),
+}
+
+
+class GanttJob(models.Model):
+    _name = 'gantt.job'
+    _description = 'Gantt Background Job'
+    _order = 'create_date desc, id desc'
+
+    name = fields.Char('Job', required=True)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+    ], default='pending', required=True, index=True)
+    user_id = fields.Many2one('res.users', string='Requested By', readonly=True)
+    model_name = fields.Char('Model', required=True, readonly=True)
+    method_name = fields.Char('Method', required=True, readonly=True)
+    record_ids = fields.Text('Records', readonly=True, help="JSON list of record ids processed in chunks")
+    payload = fields.Text('Items', readonly=True, help="JSON list of values processed in chunks, "
+                                                       "used instead of records for work that has no records yet")
+    kwargs = fields.Text('Arguments', readonly=True, help="JSON keyword arguments passed to each chunk")
+    chunk_size = fields.Integer('Chunk Size', default=JOB_CHUNK_SIZE)
+    total_count = fields.Integer('Total', readonly=True)
+    done_count = fields.Integer('Processed', readonly=True)
+    progress = fields.Float('Progress (%)', compute='_compute_progress')
+    message = fields.Text('Message', readonly=True)
+    date_started = fields.Datetime('Started', readonly=True)
+    date_done = fields.Datetime('Finished', readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', string='Result File', readonly=True)
+
+    @api.depends('done_count', 'total_count', 'state')
+    def _compute_progress(self):
+        for job in self:
+            if job.state == 'done':
+                job.progress = 100.0
+            elif job.total_count:
+                job.progress = job.done_count * 100.0 / job.total_count
+            else:
+                job.progress = 0.0
+
+    @api.model
+    def enqueue(self, name, records, method_name, kwargs=None, chunk_size=JOB_CHUNK_SIZE):
+        """
+        Queues ``records.<method_name>(**kwargs)`` to run in the background.
+        The records are split in chunks, each chunk is committed on its own
+        so progress is kept if the worker is interrupted.
+        """
+        self._check_job_method(records._name, method_name)
+        job = self.sudo().create({
+            'name': name,
+            'user_id': self.env.uid,
+            'model_name': records._name,
+            'method_name': method_name,
+            'record_ids': json.dumps(records.ids),
+            'kwargs': json.dumps(kwargs or {}),
+            'chunk_size': chunk_size,
+            'total_count': len(records),
+        })
+        self._trigger_runner()
+        return job.sudo(False)
+
+    @api.model
+    def enqueue_items(self, name, model_name, method_name, items, kwargs=None, chunk_size=JOB_CHUNK_SIZE):
+        """
+        Queues ``env[model_name].<method_name>(items_chunk, **kwargs)`` for a
+        JSON-serializable list of items, e.g. rows to import or create.
+        """
+        self._check_job_method(model_name, method_name)
+        job = self.sudo().create({
+            'name': name,
+            'user_id': self.env.uid,
+            'model_name': model_name,
+            'method_name': method_name,
+            'payload': json.dumps(items),
+            'kwargs': json.dumps(kwargs or {}),
+            'chunk_size': chunk_size,
+            'total_count': len(items),
+        })
+        self._trigger_runner()
+        return job.sudo(False)
+
+    @api.model
+    def _check_job_method(self, model_name, method_name):
+        if (model_name, method_name) not in JOB_METHODS:
+            raise UserError(f"{model_name}.{method_name} cannot run as a background job.")
+
+    @api.model
+    def _trigger_runner(self):
+        cron = self.env.ref('gantt_chart.ir_cron_gantt_job_runner', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    def action_notify_queued(self):
+        """Notification returned to the client when an action was sent to the queue"""
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Running in Background',
+                'message': f'"{self.name}" was queued for {self.total_count} records. '
+                           f'Follow it under Gantt Management > Background Jobs.',
+                'type': 'info',
+                'sticky': False,
+            }
+        }
+
+    def _discard_partial_results(self):
+        """
+        Called when jobs fail or are cancelled. Jobs that keep intermediate
+        results outside the database remove them here, a retry then starts
+        over.
+        """
+        for job in self.filtered(lambda job: job.method_name == '_export_projects_chunk'):
+            self.env['gantt.task']._discard_export(job)
+
+    def _check_job_owner(self):
+        # Jobs are read-only for users, they may only cancel or retry their own
+        if not self.env.user.has_group('base.group_system') and any(job.user_id != self.env.user for job in self):
+            raise UserError("You can only manage your own background jobs.")
+
+    def action_cancel(self):
+        self._check_job_owner()
+        jobs = self.sudo().filtered(lambda job: job.state in ('pending', 'running'))
+        jobs.write({'state': 'cancelled'})
+        jobs._discard_partial_results()
+
+    def action_retry(self):
+        self._check_job_owner()
+        self.sudo().filtered(lambda job: job.state in ('failed', 'cancelled')).write({
+            'state': 'pending',
+            'message': False,
+        })
+        self._trigger_runner()
+
+    @api.model
+    def _cron_run_jobs(self):
+        """Processes queued jobs until the time budget of this run is spent"""
+        deadline = time.monotonic() + JOB_TIME_BUDGET
+        while time.monotonic() < deadline:
+            job = self._acquire_next_job()
+            if not job:
+                return
+            job._run(deadline)
+        # Work left over, let the next cron run pick it up right away
+        if self.search_count([('state', 'in', ('pending', 'running'))]):
+            self._trigger_runner()
+
+    @api.model
+    def _acquire_next_job(self):
+        # SKIP LOCKED lets several cron workers share the queue without waiting
+        self.env.cr.execute("""
+            SELECT id FROM gantt_job
+             WHERE state IN ('pending', 'running')
+             ORDER BY id
+             LIMIT 1
+               FOR UPDATE SKIP LOCKED
+        """)
+        row = self.env.cr.fetchone()
+        return self.browse(row[0]) if row else self.browse()
+
+    def _run(self, deadline):
+        self.ensure_one()
+        if self.state == 'pending':
+            self.write({'state': 'running', 'date_started': fields.Datetime.now()})
+            self.env.cr.commit()
+
+        if (self.model_name, self.method_name) not in JOB_METHODS:
+            self.write({
+                'state': 'failed',
+                'message': f"{self.model_name}.{self.method_name} cannot run as a background job.",
+                'date_done': fields.Datetime.now(),
+            })
+            self.env.cr.commit()
+            return
+
+        items = json.loads(self.payload) if self.payload else None
+        record_ids = json.loads(self.record_ids or '[]') if items is None else items
+        kwargs = json.loads(self.kwargs or '{}')
+        chunk_size = max(self.chunk_size, 1)
+        model = self.env[self.model_name].with_user(self.user_id).with_context(gantt_job_id=self.id)
+
+        while time.monotonic() < deadline:
+            # Lock the job again, the previous commit released it, and re-read
+            # the position in case another worker processed a chunk meanwhile
+            self.env.cr.execute("SELECT state, done_count FROM gantt_job WHERE id = %s FOR UPDATE", (self.id,))
+            state, done_count = self.env.cr.fetchone()
+            self.invalidate_recordset(['state', 'done_count'])
+            if state != 'running' or done_count >= len(record_ids):
+                break
+
+            chunk = record_ids[done_count:done_count + chunk_size]
+            try:
+                if items is None:
+                    getattr(model.browse(chunk).exists(), self.method_name)(**kwargs)
+                else:
+                    getattr(model, self.method_name)(chunk, **kwargs)
+                self.write({'done_count': done_count + len(chunk)})
+                self.env.cr.commit()
+            except Exception as e:
+                self.env.cr.rollback()
+                _logger.exception(f"Gantt job {self.id} failed")
+                self.write({
+                    'state': 'failed',
+                    'message': str(e),
+                    'date_done': fields.Datetime.now(),
+                })
+                self._discard_partial_results()
+                self.env.cr.commit()
+                self._notify_user('danger', f'"{self.name}" failed: {e}')
+                return
+
+        if self.state != 'running' or self.done_count < len(record_ids):
+            return
+        self.write({'state': 'done', 'date_done': fields.Datetime.now()})
+        self.env.cr.commit()
+        self._notify_user('success', f'"{self.name}" finished ({self.total_count} records).')
+
+    def _notify_user(self, notification_type, message):
+        self.ensure_one()
+        self.env['bus.bus']._sendone(self.user_id.partner_id, 'simple_notification', {
+            'title': 'Background Job',
+            'message': message,
+            'type': notification_type,
+            'sticky': notification_type == 'danger',
+        })
+        self.env.cr.commit()
+
+    def unlink(self):
+        if any(job.state == 'running' for job in self):
+            raise UserError("Cancel running jobs before deleting them.")
+        return super().unlink()
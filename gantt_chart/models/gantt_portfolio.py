@@ -0,0 +1,115 @@
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class GanttTask(models.Model):
+    _inherit = 'gantt.task'
+
+    @api.model
+    def get_portfolio_summary(self, granularity='root', date_from=None, date_to=None, filters=None):
+        """
+        Returns one summary row per WBS root, aggregated in the database so
+        the portfolio view never downloads individual tasks. With the 'month'
+        granularity each root also gets its monthly buckets of active tasks.
+        Only roots that have a root task are listed, like the project picker.
+        A date window lists the roots with at least one task overlapping it,
+        whatever the dates of the root task, and bounds the monthly buckets.
+        With structured filters only roots with matching tasks are listed,
+        each with its match_count.
+        """
+        self.check_access_rights('read')
+        self.flush_model(['wbs', 'wbs_root', 'name', 'start_date', 'end_date',
+                          'progress', 'overall_progress', 'is_delayed'])
+        window, params = self._portfolio_date_filter(date_from, date_to)
+        # The window filters the groups, not the rows, so the root task is always aggregated
+        self.env.cr.execute(f"""
+            SELECT wbs_root,
+                   MAX(CASE WHEN wbs = wbs_root THEN id END) AS root_task_id,
+                   MAX(CASE WHEN wbs = wbs_root THEN name END) AS name,
+                   COUNT(*) AS task_count,
+                   MIN(start_date) AS start_date,
+                   MAX(end_date) AS end_date,
+                   COALESCE(MAX(CASE WHEN wbs = wbs_root THEN overall_progress END), AVG(progress), 0) AS progress,
+                   COUNT(*) FILTER (WHERE is_delayed) AS delayed_count
+              FROM gantt_task
+             WHERE wbs_root IS NOT NULL
+          GROUP BY wbs_root
+            HAVING MAX(CASE WHEN wbs = wbs_root THEN id END) IS NOT NULL
+               AND COUNT(*) FILTER (WHERE {window}) > 0
+        """, params)
+        projects = []
+        for row in self.env.cr.dictfetchall():
+            projects.append({
+                'wbs_root': row['wbs_root'],
+                'root_task_id': row['root_task_id'],
+                'name': row['name'],
+                'task_count': row['task_count'],
+                'start_date': fields.Date.to_string(row['start_date']),
+                'end_date': fields.Date.to_string(row['end_date']),
+                'progress': round(float(row['progress'] or 0), 2),
+                'delayed_count': row['delayed_count'],
+            })
+        if filters:
+            matches = self._count_filter_matches_by_root(filters)
+            projects = [project for project in projects if project['wbs_root'] in matches]
+            for project in projects:
+                project['match_count'] = matches[project['wbs_root']]
+
+        # Roots with queued rollups show the live value instead of the stored one
+        fresh = self._get_fresh_rollups({project['wbs_root'] for project in projects})
+        for project in projects:
+            if project['wbs_root'] in fresh:
+                project['progress'] = round(fresh[project['wbs_root']], 2)
+        projects.sort(key=lambda p: (not p['wbs_root'].isdigit(),
+                                     int(p['wbs_root']) if p['wbs_root'].isdigit() else 0,
+                                     p['wbs_root']))
+
+        if granularity == 'month':
+            buckets = self._get_portfolio_month_buckets(window, params)
+            for project in projects:
+                project['months'] = buckets.get(project['wbs_root'], [])
+        return projects
+
+    @api.model
+    def _portfolio_date_filter(self, date_from, date_to):
+        """SQL condition of the tasks overlapping the date window, TRUE without one"""
+        conditions, params = [], []
+        if date_from:
+            conditions.append('end_date >= %s')
+            params.append(date_from)
+        if date_to:
+            conditions.append('start_date <= %s')
+            params.append(date_to)
+        return ' AND '.join(conditions) or 'TRUE', params
+
+    @api.model
+    def _get_portfolio_month_buckets(self, window, params):
+        # Each task is counted in every month its schedule overlaps
+        self.env.cr.execute(f"""
+            SELECT wbs_root,
+                   month::date AS month,
+                   COUNT(*) AS active_tasks,
+                   AVG(COALESCE(progress, 0)) AS progress,
+                   COUNT(*) FILTER (WHERE is_delayed) AS delayed_count
+              FROM gantt_task,
+                   LATERAL generate_series(date_trunc('month', start_date),
+                                           date_trunc('month', end_date),
+                                           interval '1 month') AS month
+             WHERE wbs_root IS NOT NULL
+               AND start_date IS NOT NULL
+               AND end_date IS NOT NULL
+               AND {window}
+          GROUP BY wbs_root, month
+          ORDER BY wbs_root, month
+        """, params)
+        buckets = {}
+        for row in self.env.cr.dictfetchall():
+            buckets.setdefault(row['wbs_root'], []).append({
+                'month': fields.Date.to_string(row['month']),
+                'active_tasks': row['active_tasks'],
+                'progress': round(float(row['progress'] or 0), 2),
+                'delayed_count': row['delayed_count'],
+            })
+        return buckets
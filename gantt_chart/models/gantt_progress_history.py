@@ -0,0 +1,187 @@
+from odoo import models, fields, api, tools
+from datetime import timedelta
+from psycopg2.extras import execute_values
+import logging
+
+import numpy as np
+
+from .gantt_earned_value import EARNED_VALUE_INTERVALS
+from .schedule_tools import EPOCH
+
+_logger = logging.getLogger(__name__)
+
+
+class GanttProgressHistory(models.Model):
+    """
+    Daily progress snapshots, one row per task and day its progress or
+    weight changed. Work done and scope are stored as deltas in task-days
+    (duration weighted, like earned value), so the totals at any date are
+    running sums of one aggregate per day. Rows outlive their task, whose
+    deletion is recorded as an offsetting row instead.
+    """
+    _name = 'gantt.progress.history'
+    _description = 'Gantt Progress History'
+    _order = 'date desc, id desc'
+    _log_access = False
+
+    task_id = fields.Many2one('gantt.task', string='Task', ondelete='set null')
+    wbs_root = fields.Char('WBS Root', required=True)
+    date = fields.Date('Date', required=True)
+    progress = fields.Float('Progress (%)')
+    weight = fields.Float('Weight', help="Duration of the task when snapshotted, 0 for summary tasks")
+    done_delta = fields.Float('Work Done Change')
+    scope_delta = fields.Float('Scope Change')
+
+    def init(self):
+        # Trend queries read one project's date range, the snapshot looks up each task's last row
+        tools.create_index(self._cr, 'gantt_progress_history_root_date_index', self._table, ['wbs_root', 'date'])
+        tools.create_index(self._cr, 'gantt_progress_history_task_date_index', self._table,
+                           ['task_id', 'date DESC', 'id DESC'])
+
+    @api.model
+    def _cron_snapshot_progress(self):
+        """
+        Stores today's progress of every task whose progress, weight or WBS
+        root changed since its last snapshot, with INSERT ... SELECT per page
+        of tasks. Unchanged tasks write nothing. A task moved to another
+        root gets an offsetting row on its old root, with zero progress and
+        weight, and a full row on the new one.
+        """
+        Task = self.env['gantt.task']
+        Task.flush_model(['wbs', 'wbs_root', 'progress', 'duration'])
+        self.env.cr.execute("""
+            SELECT id, wbs, wbs_root, COALESCE(progress, 0), COALESCE(duration, 0)
+              FROM gantt_task
+             WHERE wbs_root IS NOT NULL
+        """)
+        rows = self.env.cr.fetchall()
+        parents = set()
+        for row in rows:
+            parts = row[1].split('.')
+            parents.update('.'.join(parts[:depth]) for depth in range(1, len(parts)))
+        # Summary tasks span their children, only work tasks carry weight
+        values = [(task_id, root, progress, 0 if wbs in parents else duration)
+                  for task_id, wbs, root, progress, duration in rows]
+
+        today = fields.Date.to_string(fields.Date.context_today(self))
+        # Inserted after the date is formatted in, so the VALUES placeholder is a plain %s
+        last_row = """
+                  FROM (VALUES %s) AS v(id, wbs_root, progress, weight)
+                  JOIN LATERAL (
+                        SELECT h.wbs_root, h.progress, h.weight FROM gantt_progress_history h
+                         WHERE h.task_id = v.id
+                         ORDER BY h.date DESC, h.id DESC
+                         LIMIT 1
+                  ) last ON TRUE
+        """
+        inserted = 0
+        for page in (values[offset:offset + 10000] for offset in range(0, len(values), 10000)):
+            # Tasks moved to another root (move_subtree) take their work and scope
+            # out of the old root first, the next statement credits the new one
+            execute_values(self.env.cr._obj, """
+                INSERT INTO gantt_progress_history
+                       (task_id, wbs_root, date, progress, weight, done_delta, scope_delta)
+                SELECT v.id, last.wbs_root, '%s'::date, 0, 0,
+                       -(last.progress * last.weight / 100.0), -last.weight
+                %s
+                 WHERE last.wbs_root <> v.wbs_root
+            """ % (today, last_row), page, template='(%s, %s, %s::float, %s::float)', page_size=1000)
+            inserted += len(execute_values(self.env.cr._obj, """
+                INSERT INTO gantt_progress_history
+                       (task_id, wbs_root, date, progress, weight, done_delta, scope_delta)
+                SELECT v.id, v.wbs_root, '%s'::date, v.progress, v.weight,
+                       v.progress * v.weight / 100.0
+                           - CASE WHEN last.wbs_root = v.wbs_root THEN last.progress * last.weight / 100.0 ELSE 0 END,
+                       v.weight - CASE WHEN last.wbs_root = v.wbs_root THEN last.weight ELSE 0 END
+                %s
+                 WHERE last.wbs_root IS DISTINCT FROM v.wbs_root
+                    OR last.progress IS DISTINCT FROM v.progress
+                    OR last.weight IS DISTINCT FROM v.weight
+             RETURNING id
+            """ % (today, last_row.replace('JOIN LATERAL', 'LEFT JOIN LATERAL')), page,
+                template='(%s, %s, %s::float, %s::float)', page_size=1000, fetch=True))
+        _logger.info(f"Stored {inserted} Gantt progress snapshots for {today}")
+
+
+class GanttTask(models.Model):
+    _inherit = 'gantt.task'
+
+    def unlink(self):
+        """
+        Takes the work done and scope of deleted tasks out of their project's
+        history on the deletion date. Earlier snapshots are kept, so past
+        burnup and burndown stay as they were.
+        """
+        if self.ids:
+            self.env['gantt.progress.history'].flush_model()
+            self.env.cr.execute("""
+                INSERT INTO gantt_progress_history
+                       (task_id, wbs_root, date, progress, weight, done_delta, scope_delta)
+                SELECT t.id, last.wbs_root, %s, 0, 0,
+                       -(last.progress * last.weight / 100.0), -last.weight
+                  FROM unnest(%s) AS t(id)
+                  JOIN LATERAL (
+                        SELECT h.wbs_root, h.progress, h.weight FROM gantt_progress_history h
+                         WHERE h.task_id = t.id
+                         ORDER BY h.date DESC, h.id DESC
+                         LIMIT 1
+                  ) last ON TRUE
+                 WHERE last.progress <> 0 OR last.weight <> 0
+            """, (fields.Date.context_today(self), self.ids))
+        return super().unlink()
+
+    @api.model
+    def get_progress_trends(self, wbs_root, interval='day', date_from=None, date_to=None):
+        """
+        Burnup, burndown and velocity of a project from its progress history,
+        in task-days. One GROUP BY returns the daily changes of work done
+        and scope, the running totals are cumulative sums of those:
+        ``done`` (burnup), ``scope``, ``remaining`` (burndown) and
+        ``velocity``, the work done during each interval.
+        """
+        self.check_access_rights('read')
+        step = EARNED_VALUE_INTERVALS.get(interval, 1)
+        self.env['gantt.progress.history'].flush_model()
+        self.env.cr.execute("""
+            SELECT date - DATE '1970-01-01', SUM(done_delta), SUM(scope_delta)
+              FROM gantt_progress_history
+             WHERE wbs_root = %s
+               AND date <= %s
+          GROUP BY date
+        """, (wbs_root, fields.Date.to_date(date_to) or fields.Date.context_today(self)))
+        rows = self.env.cr.fetchall()
+        result = {'wbs_root': wbs_root, 'interval': interval, 'dates': [],
+                  'done': [], 'scope': [], 'remaining': [], 'done_percent': [], 'velocity': []}
+        if not rows:
+            return result
+
+        days = np.array([row[0] for row in rows], dtype=np.int64)
+        last_day = (fields.Date.to_date(date_to) - EPOCH).days if date_to else \
+            max(int(days.max()), (fields.Date.context_today(self) - EPOCH).days)
+        first_day = max(int(days.min()), (fields.Date.to_date(date_from) - EPOCH).days if date_from else 0)
+        if first_day > last_day:
+            return result
+
+        # Changes before the window only count in the opening totals
+        done_deltas = np.array([row[1] for row in rows], dtype=np.float64)
+        scope_deltas = np.array([row[2] for row in rows], dtype=np.float64)
+        offsets = np.clip(days - first_day, 0, None)
+        n_days = last_day - first_day + 1
+        done = np.cumsum(np.bincount(offsets, weights=done_deltas, minlength=n_days))
+        scope = np.cumsum(np.bincount(offsets, weights=scope_deltas, minlength=n_days))
+        done_before = float(done_deltas[days < first_day].sum())
+
+        grid = np.arange(step - 1, n_days, step)
+        if not len(grid) or grid[-1] != n_days - 1:
+            grid = np.append(grid, n_days - 1)
+        done, scope = done[grid], scope[grid]
+        result.update({
+            'dates': [fields.Date.to_string(EPOCH + timedelta(days=first_day + int(offset))) for offset in grid],
+            'done': np.round(done, 2).tolist(),
+            'scope': np.round(scope, 2).tolist(),
+            'remaining': np.round(scope - done, 2).tolist(),
+            'done_percent': np.round(np.divide(done * 100.0, scope, out=np.zeros_like(done), where=scope > 0),
+                                     2).tolist(),
+            'velocity': np.round(np.diff(done, prepend=done_before), 2).tolist(),
+        })
+        return result
@@ -0,0 +1,148 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from psycopg2.extras import execute_values
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Stored fields recomputed on the copies, their inputs may have changed
+CLONE_RECOMPUTED_FIELDS = ['wbs_root', 'duration', 'is_delayed', 'overall_progress']
+
+
+class GanttTask(models.Model):
+    _inherit = 'gantt.task'
+
+    def clone_subtree(self, new_wbs, date_offset=0, reset_progress=True, project_id=None, name=None):
+        """
+        Copies this task and all its descendants under a new WBS code, e.g.
+        a template "9" cloned to "12". Dates move by ``date_offset`` days and
+        dependencies between copied tasks point to the copies. All rows are
+        inserted by one INSERT ... SELECT with ids taken from the sequence
+        up front, so the old to new id mapping is known without a lookup.
+        Returns the new top task.
+        """
+        self.ensure_one()
+        self.check_access_rights('create')
+        new_wbs = self._clean_wbs_code(new_wbs)
+        old_wbs = self.wbs
+        if new_wbs.startswith(f'{old_wbs}.'):
+            raise UserError(f"Task {old_wbs} cannot be cloned below itself.")
+
+        self.flush_model()
+        self._check_wbs_available(new_wbs)
+        self.env.cr.execute("""
+            SELECT id, wbs, dependencies FROM gantt_task
+             WHERE wbs = %s OR wbs LIKE %s
+             ORDER BY id
+        """, (old_wbs, f'{old_wbs}.%'))
+        sources = self.env.cr.fetchall()
+        self.env.cr.execute("SELECT nextval('gantt_task_id_seq') FROM generate_series(1, %s)", (len(sources),))
+        new_ids = [row[0] for row in self.env.cr.fetchall()]
+        id_map = {source[0]: new_id for source, new_id in zip(sources, new_ids)}
+
+        values = [
+            (old_id, id_map[old_id], new_wbs + wbs[len(old_wbs):], self._remap_dependencies(dependencies, id_map))
+            for old_id, wbs, dependencies in sources
+        ]
+        progress = '0' if reset_progress else 't.progress'
+        project = int(project_id) if project_id else 't.project_id'
+        execute_values(self.env.cr._obj, f"""
+            INSERT INTO gantt_task (id, wbs, wbs_root, name, project_id, lead, start_date, end_date,
+                                    duration, optimistic_duration, pessimistic_duration,
+                                    calendar_id, progress, overall_progress, is_delayed,
+                                    dependencies, color, description, priority,
+                                    create_uid, create_date, write_uid, write_date)
+            SELECT v.new_id, v.wbs, split_part(v.wbs, '.', 1), t.name, {project}, t.lead,
+                   t.start_date + {int(date_offset)}, t.end_date + {int(date_offset)},
+                   t.duration, t.optimistic_duration, t.pessimistic_duration,
+                   t.calendar_id, {progress}, {progress}, t.is_delayed,
+                   v.dependencies, t.color, t.description, t.priority,
+                   {int(self.env.uid)}, now() at time zone 'UTC', {int(self.env.uid)}, now() at time zone 'UTC'
+              FROM gantt_task t
+              JOIN (VALUES %s) AS v(old_id, new_id, wbs, dependencies) ON t.id = v.old_id
+        """, values, page_size=1000)
+
+        clones = self.browse(new_ids)
+        for field_name in CLONE_RECOMPUTED_FIELDS:
+            self.env.add_to_compute(self._fields[field_name], clones)
+        clones._validate_fields(['start_date', 'end_date', 'progress'])
+        clones.flush_recordset()
+        # Cloning into an existing project (e.g. "3.7") changes that root's rollup
+        clones._queue_parent_rollups()
+
+        top = clones.filtered(lambda task: task.wbs == new_wbs)
+        if name:
+            top._with_bulk_mode().write({'name': name})
+        clones._with_bulk_mode()._post_bulk_summary(f'Cloned from {old_wbs}')
+        _logger.info(f"Cloned WBS subtree {old_wbs} to {new_wbs} ({len(clones)} tasks)")
+        return top
+
+    @api.model
+    def _remap_dependencies(self, dependencies, id_map):
+        """Points dependencies on copied tasks to their copies, others are kept"""
+        if not dependencies:
+            return dependencies
+        remapped = []
+        for ref in dependencies.split(','):
+            ref = ref.strip()
+            if ref.isdigit() and int(ref) in id_map:
+                ref = str(id_map[int(ref)])
+            if ref:
+                remapped.append(ref)
+        return ','.join(remapped)
+
+    def action_open_clone_wizard(self):
+        self.ensure_one()
+        return {
+            'name': 'Clone Project',
+            'type': 'ir.actions.act_window',
+            'res_model': 'gantt.project.clone.wizard',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': {'default_task_id': self.id},
+        }
+
+
+class GanttProjectCloneWizard(models.TransientModel):
+    _name = 'gantt.project.clone.wizard'
+    _description = 'Clone a WBS Branch as a New Project'
+
+    task_id = fields.Many2one('gantt.task', string='Template', required=True)
+    template_wbs = fields.Char(related='task_id.wbs', string='Template WBS')
+    template_start = fields.Date('Template Start', compute='_compute_template_start')
+    new_wbs = fields.Char('New WBS', required=True, default=lambda self: self._default_new_wbs())
+    name = fields.Char('New Name', help="Leave empty to keep the template name")
+    new_start_date = fields.Date('New Start Date', help="Dates are shifted so the copy starts on this day")
+    project_id = fields.Many2one('project.project', string='Project',
+                                 help="Leave empty to keep the template's projects")
+    reset_progress = fields.Boolean('Reset Progress', default=True)
+
+    @api.model
+    def _default_new_wbs(self):
+        # Next free numeric root
+        self.env.cr.execute("""
+            SELECT COALESCE(MAX(wbs_root::int), 0) + 1 FROM gantt_task WHERE wbs_root ~ '^[0-9]+$'
+        """)
+        return str(self.env.cr.fetchone()[0])
+
+    @api.depends('task_id')
+    def _compute_template_start(self):
+        for wizard in self:
+            wbs = wizard.task_id.wbs
+            if not wbs:
+                wizard.template_start = False
+                continue
+            self.env['gantt.task'].flush_model(['wbs', 'start_date'])
+            self.env.cr.execute("""
+                SELECT MIN(start_date) FROM gantt_task WHERE wbs = %s OR wbs LIKE %s
+            """, (wbs, f'{wbs}.%'))
+            wizard.template_start = self.env.cr.fetchone()[0]
+
+    def action_clone(self):
+        self.ensure_one()
+        offset = (self.new_start_date - self.template_start).days \
+            if self.new_start_date and self.template_start else 0
+        top = self.task_id.clone_subtree(
+            self.new_wbs, date_offset=offset, reset_progress=self.reset_progress,
+            project_id=self.project_id.id, name=self.name)
+        return top.open_gantt_chart()
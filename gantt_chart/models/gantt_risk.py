@@ -0,0 +1,126 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import logging
+import multiprocessing
+import os
+
+import numpy as np
+
+from .schedule_tools import from_days, simulate_schedule
+
+_logger = logging.getLogger(__name__)
+
+RISK_MAX_SIMULATIONS = 100000
+RISK_PERCENTILES = (50, 80, 95)
+
+
+class GanttTask(models.Model):
+    _inherit = 'gantt.task'
+
+    @api.model
+    def _read_duration_estimates(self, schedule):
+        """Optimistic, most likely and pessimistic durations aligned with the schedule arrays"""
+        self.flush_model(['optimistic_duration', 'pessimistic_duration'])
+        self.env.cr.execute("""
+            SELECT id, COALESCE(optimistic_duration, 0), COALESCE(pessimistic_duration, 0), COALESCE(progress, 0)
+              FROM gantt_task
+             WHERE id = ANY(%s)
+             ORDER BY id
+        """, (schedule['ids'].tolist(),))
+        rows = self.env.cr.fetchall()
+        likely = schedule['duration'].astype(np.float64)
+        optimistic = np.array([row[1] for row in rows], dtype=np.float64)
+        pessimistic = np.array([row[2] for row in rows], dtype=np.float64)
+        low = np.where(optimistic > 0, np.minimum(optimistic, likely), likely)
+        high = np.where(pessimistic > 0, np.maximum(pessimistic, likely), likely)
+        # Finished tasks have no uncertainty left
+        done = np.array([row[3] >= 100 for row in rows])
+        low[done] = high[done] = likely[done]
+        return np.maximum(low, 1), likely, high
+
+    @api.model
+    def _simulate_in_pool(self, model, low, likely, high, simulations, seed, workers):
+        """
+        Splits the simulations over worker processes, which only receive the
+        plain arrays. They are started by a fork server, never forked from
+        this server worker with its cursor, locks and threads. Returns None
+        when the pool cannot run, e.g. the addon cannot be imported by a fresh
+        interpreter, and the caller simulates in process instead.
+        """
+        shares = [len(part) for part in np.array_split(np.arange(simulations), workers)]
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('forkserver')) \
+                    as executor:
+                return list(executor.map(
+                    simulate_schedule, [model] * workers, [low] * workers, [likely] * workers,
+                    [high] * workers, shares, seeds))
+        except (BrokenProcessPool, OSError) as error:
+            _logger.warning(f"Risk analysis worker pool unavailable, simulating in process: {error}")
+            return None
+
+    @api.model
+    def get_risk_analysis(self, wbs_root, simulations=10000, workers=0, seed=None):
+        """
+        Monte Carlo schedule risk analysis of a project. Each task's duration
+        is drawn from a triangular distribution between its optimistic and
+        pessimistic estimates, peaking at its planned duration, and pushed
+        through the finish-to-start dependencies (see simulate_schedule).
+        Returns the P50/P80/P95 finish dates, the chance of finishing by the
+        planned date and each work task's criticality index, the share of
+        simulations in which it was on the critical path. Simulations run in
+        this process unless ``workers`` above 1 explicitly asks to split them
+        over that many processes.
+        """
+        simulations = int(simulations)
+        workers = int(workers or 0)
+        if not 0 < simulations <= RISK_MAX_SIMULATIONS:
+            raise UserError(f"The number of simulations must be between 1 and {RISK_MAX_SIMULATIONS}.")
+        if workers < 0:
+            raise UserError("The number of workers cannot be negative.")
+        schedule = self.env['gantt.schedule.sandbox']._load(wbs_root)
+        low, likely, high = self._read_duration_estimates(schedule)
+
+        # Summary tasks span their children, only work tasks define the finish
+        parents = set()
+        for wbs in schedule['wbs']:
+            parts = wbs.split('.')
+            parents.update('.'.join(parts[:depth]) for depth in range(1, len(parts)))
+        work = np.array([wbs not in parents for wbs in schedule['wbs']])
+
+        model = {key: schedule[key] for key in ('start', 'calendar', 'prefixes', 'level_edges')}
+        model['work'] = work
+        workers = min(workers, os.cpu_count() or 1, simulations)
+        results = self._simulate_in_pool(model, low, likely, high, simulations, seed, workers) \
+            if workers > 1 else None
+        if results:
+            finishes = np.concatenate([result[0] for result in results])
+            critical_counts = sum(result[1] for result in results)
+        else:
+            finishes, critical_counts = simulate_schedule(model, low, likely, high, simulations, seed)
+
+        planned_finish = int(schedule['end'][work].max())
+        percentiles = np.percentile(finishes, RISK_PERCENTILES, method='higher')
+        criticality = critical_counts / simulations
+        tasks = [
+            {'id': int(schedule['ids'][position]),
+             'wbs': schedule['wbs'][position],
+             'criticality': round(float(criticality[position]), 4)}
+            for position in np.flatnonzero(work).tolist()
+        ]
+        tasks.sort(key=lambda task: -task['criticality'])
+        _logger.info(f"Risk analysis of WBS root {wbs_root}: {simulations} simulations of {len(work)} tasks")
+        return {
+            'wbs_root': wbs_root,
+            'simulations': simulations,
+            'planned_finish': fields.Date.to_string(from_days([planned_finish])[0]),
+            'mean_finish': fields.Date.to_string(from_days([round(float(finishes.mean()))])[0]),
+            'finish_dates': {
+                f'p{percentile}': fields.Date.to_string(day)
+                for percentile, day in zip(RISK_PERCENTILES, from_days(percentiles))
+            },
+            'on_time_probability': round(float((finishes <= planned_finish).mean()), 4),
+            'tasks': tasks,
+        }
@@ -0,0 +1,125 @@
+from odoo import models, fields, api
+from datetime import timedelta
+from psycopg2.extras import execute_values
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Seconds a dirty rollup waits, so a burst of subtask edits is computed once
+ROLLUP_DELAY = 30
+
+
+class GanttRollupQueue(models.Model):
+    _name = 'gantt.rollup.queue'
+    _description = 'Pending Gantt Parent Rollup'
+    _log_access = False
+
+    # Insert-only: writers never update a shared row, the runner deletes what it processed
+    wbs_root = fields.Char('WBS Root', required=True, index=True)
+    queued_at = fields.Datetime('Queued At', default=fields.Datetime.now)
+
+    @api.model
+    def _enqueue(self, roots):
+        roots = sorted(roots)
+        self.env.cr.execute("""
+            SELECT DISTINCT wbs_root FROM gantt_rollup_queue WHERE wbs_root = ANY(%s)
+        """, (roots,))
+        already_queued = {row[0] for row in self.env.cr.fetchall()}
+        self.env.cr.execute("""
+            INSERT INTO gantt_rollup_queue (wbs_root, queued_at)
+            SELECT root, now() at time zone 'UTC' FROM unnest(%s::varchar[]) AS root
+        """, (roots,))
+        # A root already waiting has its run scheduled, only new ones need a trigger
+        if set(roots) - already_queued:
+            cron = self.env.ref('gantt_chart.ir_cron_gantt_rollup', raise_if_not_found=False)
+            if cron:
+                cron.sudo()._trigger(fields.Datetime.now() + timedelta(seconds=ROLLUP_DELAY))
+
+    @api.model
+    def _pending_roots(self, roots):
+        self.env.cr.execute("""
+            SELECT DISTINCT wbs_root FROM gantt_rollup_queue WHERE wbs_root = ANY(%s)
+        """, (list(roots),))
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def _cron_process_rollups(self):
+        """
+        Recomputes every queued root once, however many subtask edits queued
+        it. Root rows locked by a user transaction are skipped and queued
+        again instead of waited for.
+        """
+        self.env.cr.execute("DELETE FROM gantt_rollup_queue RETURNING wbs_root")
+        roots = {row[0] for row in self.env.cr.fetchall()}
+        if not roots:
+            return
+
+        self.env.cr.execute("""
+            SELECT wbs FROM gantt_task
+             WHERE wbs = ANY(%s)
+               FOR UPDATE SKIP LOCKED
+        """, (list(roots),))
+        available = {row[0] for row in self.env.cr.fetchall()}
+        if roots - available:
+            self.env.cr.execute("""
+                SELECT DISTINCT wbs FROM gantt_task WHERE wbs = ANY(%s)
+            """, (list(roots - available),))
+            busy = {row[0] for row in self.env.cr.fetchall()}
+            if busy:
+                self._enqueue(busy)
+
+        Task = self.env['gantt.task']
+        values = [(task_id, value) for task_id, wbs, value in Task._read_rollup_values(available)]
+        if values:
+            execute_values(self.env.cr._obj, """
+                UPDATE gantt_task AS t
+                   SET overall_progress = v.overall_progress
+                  FROM (VALUES %s) AS v(id, overall_progress)
+                 WHERE t.id = v.id
+            """, values, page_size=1000)
+            Task.browse([value[0] for value in values]).invalidate_recordset(['overall_progress'])
+        _logger.info(f"Recomputed {len(values)} Gantt parent rollups")
+
+
+class GanttTask(models.Model):
+    _inherit = 'gantt.task'
+
+    @api.model
+    def _read_rollup_values(self, roots):
+        """
+        Current overall progress of the given root tasks, with one aggregate
+        query: the average progress of their subtasks, or their own progress
+        when they have none. Returns (task id, wbs, value) tuples.
+        """
+        if not roots:
+            return []
+        self.flush_model(['wbs', 'wbs_root', 'progress'])
+        self.env.cr.execute("""
+            SELECT r.id,
+                   r.wbs,
+                   CASE WHEN COUNT(c.id) > 0 THEN AVG(COALESCE(c.progress, 0))
+                        ELSE COALESCE(r.progress, 0) END
+              FROM gantt_task r
+              LEFT JOIN gantt_task c ON c.wbs_root = r.wbs AND c.wbs LIKE r.wbs || '.%%'
+             WHERE r.wbs = ANY(%s)
+               AND r.wbs NOT LIKE '%%.%%'
+          GROUP BY r.id, r.wbs
+        """, (list(roots),))
+        return [(task_id, wbs, float(value)) for task_id, wbs, value in self.env.cr.fetchall()]
+
+    @api.model
+    def _get_fresh_rollups(self, roots):
+        """On-read fallback: live values of the given roots still waiting in the queue, by WBS"""
+        pending = self.env['gantt.rollup.queue']._pending_roots(roots) if roots else set()
+        return {wbs: value for task_id, wbs, value in self._read_rollup_values(pending)}
+
+    def read(self, fields=None, load='_classic_read'):
+        result = super().read(fields, load)
+        if fields is None or 'overall_progress' in fields:
+            roots = {task.id: task.wbs for task in self if task.wbs and '.' not in task.wbs}
+            fresh = self._get_fresh_rollups(set(roots.values()))
+            if fresh:
+                for row in result:
+                    if roots.get(row['id']) in fresh:
+                        row['overall_progress'] = fresh[roots[row['id']]]
+        return result
@@ -0,0 +1,263 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.tools.lru import LRU
+from collections import defaultdict
+import logging
+
+import numpy as np
+
+from .schedule_tools import (
+    EPOCH, add_working_days, count_working_days, dependency_levels, from_days, group_edges_by_successor,
+    parse_dependency_edges, place_tasks,
+)
+
+_logger = logging.getLogger(__name__)
+
+# Loaded schedules kept per server process, each one can take a few MB
+SANDBOX_CACHE_SIZE = 8
+# (database, WBS root) -> (revision, schedule), the revision tells whether it is current
+_schedule_cache = LRU(SANDBOX_CACHE_SIZE)
+
+
+class GanttScheduleSandbox(models.AbstractModel):
+    """
+    What-if scheduling on an in-memory copy of one WBS root. The schedule is
+    loaded once per revision into arrays (ids, dates, working durations,
+    dependency levels) and every evaluation only copies the date arrays,
+    applies the hypothetical edits and pushes successors level by level.
+    Nothing is written unless the edits are committed.
+    """
+    _name = 'gantt.schedule.sandbox'
+    _description = 'Gantt What-If Scheduling Sandbox'
+
+    @api.model
+    def _get_revision(self, wbs_root):
+        self.env['gantt.task'].flush_model()
+        self.env.cr.execute("""
+            SELECT COUNT(*), MAX(write_date) FROM gantt_task WHERE wbs_root = %s
+        """, (wbs_root,))
+        count, last_write = self.env.cr.fetchone()
+        return f'{count}-{last_write}'
+
+    @api.model
+    def _load(self, wbs_root):
+        self.env['gantt.task'].check_access_rights('read')
+        # Kept out of the registry's ormcache, schedules would evict its small entries on every edit
+        revision = self._get_revision(wbs_root)
+        key = (self.env.cr.dbname, wbs_root)
+        cached = _schedule_cache.get(key)
+        if cached and cached[0] == revision:
+            return cached[1]
+        schedule = self._load_schedule(wbs_root)
+        _schedule_cache[key] = (revision, schedule)
+        return schedule
+
+    @api.model
+    def _load_schedule(self, wbs_root):
+        self.env.cr.execute("""
+            SELECT id, wbs, start_date - DATE '1970-01-01', end_date - DATE '1970-01-01',
+                   COALESCE(progress, 0), COALESCE(lead, 0), COALESCE(calendar_id, 0), dependencies
+              FROM gantt_task
+             WHERE wbs_root = %s
+               AND start_date IS NOT NULL
+               AND end_date IS NOT NULL
+             ORDER BY id
+        """, (wbs_root,))
+        rows = self.env.cr.fetchall()
+        if not rows:
+            raise UserError(f"No scheduled tasks found for project {wbs_root}.")
+
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        starts = np.array([row[2] for row in rows], dtype=np.int64)
+        ends = np.array([row[3] for row in rows], dtype=np.int64)
+        calendar_ids = sorted({row[6] for row in rows} - {0})
+        calendar_index = {calendar_id: index for index, calendar_id in enumerate(calendar_ids)}
+        calendars = np.array([calendar_index.get(row[6], -1) for row in rows], dtype=np.int64)
+        prefixes = [self.env['resource.calendar'].browse(calendar_id)._get_workday_prefix_sums()
+                    for calendar_id in calendar_ids]
+
+        # Durations in working days of each task's calendar, calendar days without one
+        durations = ends - starts + 1
+        for index, prefix in enumerate(prefixes):
+            mask = calendars == index
+            durations[mask] = count_working_days(prefix, starts[mask], ends[mask])
+
+        preds, succs = parse_dependency_edges(ids, [row[7] for row in rows])
+        levels, level_edges, cyclic = dependency_levels(len(ids), preds, succs)
+        if cyclic.any():
+            _logger.warning(f"Dependency cycle in WBS root {wbs_root}, "
+                            f"{int(cyclic.sum())} tasks are not propagated")
+
+        schedule = {
+            'ids': ids,
+            'wbs': [row[1] for row in rows],
+            'start': starts,
+            'end': ends,
+            'duration': np.maximum(durations, 1),
+            'progress': np.array([row[4] for row in rows], dtype=np.float64),
+            'lead': np.array([row[5] for row in rows], dtype=np.int64),
+            'calendar': calendars,
+            'prefixes': prefixes,
+            # Edges into each level grouped by successor, levels without edges are dropped
+            'level_edges': [group_edges_by_successor(preds, succs) for preds, succs in level_edges if len(succs)],
+            'is_root': np.array([row[1] == wbs_root for row in rows]),
+        }
+        for value in schedule.values():
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+        return schedule
+
+    @api.model
+    def _run(self, schedule, edits):
+        """
+        Applies the edits to copies of the schedule arrays and propagates
+        finish-to-start dependencies. Each edit targets a ``task_id`` or all
+        tasks of a ``lead_id`` and may set ``start_date``/``end_date``, shift
+        by ``shift_days`` working days, set ``progress`` or reassign ``lead``.
+        """
+        ids = schedule['ids']
+        start = schedule['start'].copy()
+        end = schedule['end'].copy()
+        duration = schedule['duration'].copy()
+        progress = schedule['progress'].copy()
+        lead = schedule['lead'].copy()
+        calendar = schedule['calendar']
+        prefixes = schedule['prefixes']
+
+        for edit in edits or []:
+            if edit.get('task_id'):
+                position = np.searchsorted(ids, int(edit['task_id']))
+                if position >= len(ids) or ids[position] != int(edit['task_id']):
+                    raise UserError(f"Task {edit['task_id']} is not part of this project.")
+                targets = np.array([position])
+            elif edit.get('lead_id') is not None:
+                targets = np.flatnonzero(schedule['lead'] == int(edit['lead_id'] or 0))
+            else:
+                continue
+            if not len(targets):
+                continue
+
+            if edit.get('start_date') or edit.get('end_date'):
+                if edit.get('start_date'):
+                    start[targets] = (fields.Date.to_date(edit['start_date']) - EPOCH).days
+                if edit.get('end_date'):
+                    end[targets] = (fields.Date.to_date(edit['end_date']) - EPOCH).days
+                end[targets] = np.maximum(end[targets], start[targets])
+                duration[targets] = end[targets] - start[targets] + 1
+                for index, prefix in enumerate(prefixes):
+                    mask = calendar[targets] == index
+                    duration[targets[mask]] = np.maximum(count_working_days(
+                        prefix, start[targets[mask]], end[targets[mask]]), 1)
+            if edit.get('shift_days'):
+                shift = int(edit['shift_days'])
+                requested = start[targets] + shift
+                for index, prefix in enumerate(prefixes):
+                    # Shifts count working days on calendar tasks, like action_shift_working_days
+                    mask = calendar[targets] == index
+                    requested[mask] = add_working_days(prefix, start[targets[mask]], shift)
+                start[targets], end[targets] = place_tasks(prefixes, calendar[targets], requested, duration[targets])
+            if edit.get('progress') is not None:
+                progress[targets] = float(edit['progress'])
+            if 'lead' in edit:
+                lead[targets] = int(edit['lead'] or 0)
+
+        # Push successors that would start before a predecessor ends, level by level
+        for preds, succs, starts in schedule['level_edges']:
+            required = np.maximum.reduceat(end[preds] + 1, starts)
+            late = required > start[succs]
+            if late.any():
+                tasks = succs[late]
+                start[tasks], end[tasks] = place_tasks(prefixes, calendar[tasks], required[late], duration[tasks])
+
+        return {'start': start, 'end': end, 'progress': progress, 'lead': lead}
+
+    @api.model
+    def _summarize(self, schedule, start, end, progress):
+        # Same rule as _read_rollup_values: average of the subtasks, else the root's own progress
+        subtasks = ~schedule['is_root']
+        return {
+            'start_date': fields.Date.to_string(from_days([start.min()])[0]),
+            'end_date': fields.Date.to_string(from_days([end.max()])[0]),
+            'overall_progress': round(float(progress[subtasks].mean() if subtasks.any() else progress.mean()), 2),
+        }
+
+    @api.model
+    def evaluate(self, wbs_root, edits=None):
+        """
+        Returns the schedule of ``wbs_root`` as it would be after the edits:
+        changed tasks with their old and new values, and the project rollup
+        (span and overall progress) before and after. Nothing is written.
+        """
+        schedule = self._load(wbs_root)
+        result = self._run(schedule, edits)
+        start, end, progress, lead = result['start'], result['end'], result['progress'], result['lead']
+
+        changed = np.flatnonzero(
+            (start != schedule['start']) | (end != schedule['end'])
+            | (progress != schedule['progress']) | (lead != schedule['lead']))
+        old_starts, old_ends = from_days(schedule['start'][changed]), from_days(schedule['end'][changed])
+        new_starts, new_ends = from_days(start[changed]), from_days(end[changed])
+        tasks = []
+        for position, old_start, old_end, new_start, new_end in zip(
+                changed.tolist(), old_starts, old_ends, new_starts, new_ends):
+            tasks.append({
+                'id': int(schedule['ids'][position]),
+                'wbs': schedule['wbs'][position],
+                'start_date': fields.Date.to_string(new_start),
+                'end_date': fields.Date.to_string(new_end),
+                'old_start_date': fields.Date.to_string(old_start),
+                'old_end_date': fields.Date.to_string(old_end),
+                'finish_shift': (new_end - old_end).days,
+                'progress': float(progress[position]),
+                'lead': int(lead[position]) or False,
+            })
+        before = self._summarize(schedule, schedule['start'], schedule['end'], schedule['progress'])
+        after = self._summarize(schedule, start, end, progress)
+        return {
+            'wbs_root': wbs_root,
+            'revision': self._get_revision(wbs_root),
+            'tasks': tasks,
+            'before': before,
+            'after': after,
+            'finish_shift': (fields.Date.to_date(after['end_date']) - fields.Date.to_date(before['end_date'])).days,
+        }
+
+    @api.model
+    def commit(self, wbs_root, edits=None, revision=None):
+        """
+        Applies the edits for real. Dates are stored with one batched update,
+        progress and lead changes with one write per distinct value, all in
+        bulk mode. If the project changed since ``revision`` was evaluated,
+        nothing is written and the caller has to evaluate again.
+        """
+        # Record rules of the changed tasks are checked when they are written
+        self.env['gantt.task'].check_access_rights('write')
+        if revision and revision != self._get_revision(wbs_root):
+            raise UserError("The project was changed by someone else meanwhile, please review the scenario again.")
+        preview = self.evaluate(wbs_root, edits)
+        if not preview['tasks']:
+            return preview
+
+        Task = self.env['gantt.task']._with_bulk_mode()
+        schedule = self._load(wbs_root)
+        positions = {int(task_id): position for position, task_id in enumerate(schedule['ids'].tolist())}
+        date_values = []
+        by_values = defaultdict(list)
+        for task in preview['tasks']:
+            position = positions[task['id']]
+            if task['start_date'] != task['old_start_date'] or task['end_date'] != task['old_end_date']:
+                date_values.append((task['id'], task['start_date'], task['end_date']))
+            vals = {}
+            if task['progress'] != schedule['progress'][position]:
+                vals['progress'] = task['progress']
+            if (task['lead'] or 0) != schedule['lead'][position]:
+                vals['lead'] = task['lead']
+            if vals:
+                by_values[tuple(sorted(vals.items()))].append(task['id'])
+
+        Task._write_dates_batch(date_values)
+        for vals, task_ids in by_values.items():
+            Task.browse(task_ids).write(dict(vals))
+        Task.browse([task['id'] for task in preview['tasks']])._post_bulk_summary(
+            'What-if scenario applied', ['start_date', 'end_date', 'progress', 'lead'])
+        return preview
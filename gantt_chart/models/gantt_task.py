@@ -1,9 +1,30 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
+from odoo.osv import expression
+from collections import defaultdict
 from datetime import date, datetime, timedelta
+from markupsafe import Markup
+from psycopg2.extras import execute_values
 import logging
 
+from .gantt_job import JOB_THRESHOLD
+from .schedule_tools import compute_durations
+
 _logger = logging.getLogger(__name__)
 
+# Number of users returned per page by the assignee directory
+ASSIGNEE_PAGE_SIZE = 500
+
+# Context applied in bulk mode (gantt_bulk_mode=True): no chatter entry,
+# tracking values or follower subscription per task
+BULK_MODE_CONTEXT = {
+    'tracking_disable': True,
+    'mail_create_nolog': True,
+    'mail_create_nosubscribe': True,
+    'mail_notrack': True,
+}
+# Tasks listed by name in a bulk summary message
+BULK_SUMMARY_MAX_TASKS = 20
+
 
 class GanttTask(models.Model):
     _name = 'gantt.task'
@@ -13,12 +34,23 @@ class GanttTask(models.Model):
 
     project_id = fields.Many2one('project.project', string='Project')
     wbs = fields.Char('S. no.', required=True)
-    name = fields.Char('Project Name', required=True)
-    lead = fields.Many2one('res.users', string='Assignee')
+    wbs_root = fields.Char('WBS Root', compute='_compute_wbs_root', store=True, index=True,
+                           help="First segment of the WBS code, identifies the project")
+    name = fields.Char('Project Name', required=True, index='trigram')
+    lead = fields.Many2one('res.users', string='Assignee', index=True)
     start_date = fields.Date('Start Date', required=True)
     end_date = fields.Date('End Date', required=True)
-    is_delayed = fields.Boolean(compute="_compute_is_delayed", store=True)
+    is_delayed = fields.Boolean(compute="_compute_is_delayed", store=True, index=True)
     duration = fields.Integer(string='Days', compute='_compute_duration', store=True)
+    calendar_id = fields.Many2one('resource.calendar', string='Working Calendar',
+                                  help="Duration counts the working days of this calendar. "
+                                       "Leave empty to count calendar days.")
+    optimistic_duration = fields.Integer('Optimistic Days',
+                                         help="Shortest likely duration, used by the schedule risk analysis. "
+                                              "Leave empty to use Days.")
+    pessimistic_duration = fields.Integer('Pessimistic Days',
+                                          help="Longest likely duration, used by the schedule risk analysis. "
+                                               "Leave empty to use Days.")
     progress = fields.Float('Progress (%)', default=0, help="Progress percentage (0-100)")
     overall_progress = fields.Float('Overall Progress (%)', default=0, help="Overall progress percentage (0-100)",
                                     compute="_compute_overall_progress", store=True)
@@ -49,19 +81,65 @@ class GanttTask(models.Model):
             _logger.warning(f"Error getting project info for task {self.id}: {str(e)}")
             return {'id': False, 'name': 'No Project'}
 
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """Override create - simplified version without project auto-linking"""
-        # Don't try to auto-create projects, just create the task
-        task = super(GanttTask, self).create(vals)
+        # Don't try to auto-create projects, just create the tasks
+        tasks = super(GanttTask, self._bulk_mode_context()).create(vals_list)
+
+        # Parent tasks' overall progress is recomputed later, see gantt.rollup.queue
+        tasks._queue_parent_rollups()
+        return tasks.with_env(self.env)
 
-        # Trigger recalculation of parent task's overall progress
-        if task.wbs and '.' in task.wbs:
-            parent_wbs = task.wbs.split('.')[0]
-            parent_task = self.search([('wbs', '=', parent_wbs)], limit=1)
-            if parent_task:
-                parent_task._compute_overall_progress()
-        return task
+    def _bulk_mode_context(self):
+        """Records with mail.thread bookkeeping disabled when bulk mode is on"""
+        if self.env.context.get('gantt_bulk_mode'):
+            return self.with_context(**BULK_MODE_CONTEXT)
+        return self
+
+    def _with_bulk_mode(self):
+        return self.with_context(gantt_bulk_mode=True)
+
+    def _queue_parent_rollups(self, roots=None):
+        """
+        Marks the roots of these subtasks dirty instead of writing them now,
+        so concurrent subtask edits never lock the shared root row.
+        """
+        roots = set(roots or ()) | {task.wbs_root for task in self if task.wbs and '.' in task.wbs}
+        if roots:
+            self.env['gantt.rollup.queue']._enqueue(roots)
+
+    def _post_bulk_summary(self, action, field_names=None):
+        """
+        Posts one note per project on its WBS root task, summarizing a bulk
+        operation on these tasks, instead of one chatter entry per task.
+        """
+        tasks_by_root = defaultdict(list)
+        for task in self:
+            if task.wbs_root:
+                tasks_by_root[task.wbs_root].append(task.id)
+        if not tasks_by_root:
+            return
+
+        labels = [self._fields[name].string for name in field_names or [] if name in self._fields]
+        changed = f" ({', '.join(labels)})" if labels else ''
+        for root_task in self.search([('wbs', 'in', list(tasks_by_root))]):
+            tasks = self.browse(tasks_by_root[root_task.wbs])
+            items = Markup('').join(
+                Markup('<li>%s %s</li>') % (task.wbs, task.name)
+                for task in tasks[:BULK_SUMMARY_MAX_TASKS]
+            )
+            if len(tasks) > BULK_SUMMARY_MAX_TASKS:
+                items += Markup('<li>... and %s more</li>') % (len(tasks) - BULK_SUMMARY_MAX_TASKS)
+            root_task.message_post(
+                body=Markup('<p>%s: %s tasks%s</p><ul>%s</ul>') % (action, len(tasks), changed, items),
+                subtype_xmlid='mail.mt_note',
+            )
+
+    @api.depends('wbs')
+    def _compute_wbs_root(self):
+        for task in self:
+            task.wbs_root = task.wbs.split('.')[0] if task.wbs else False
 
     @api.depends('progress', 'wbs')
     def _compute_overall_progress(self):
@@ -85,15 +163,10 @@ class GanttTask(models.Model):
                 task.overall_progress = task.progress
 
     def write(self, vals):
-        result = super(GanttTask, self).write(vals)
-        # If progress changed, update parent task's overall progress
+        result = super(GanttTask, self._bulk_mode_context()).write(vals)
+        # If progress changed, queue the parent tasks' overall progress
         if 'progress' in vals:
-            for task in self:
-                if task.wbs and '.' in task.wbs:
-                    parent_wbs = task.wbs.split('.')[0]
-                    parent_task = self.search([('wbs', '=', parent_wbs)], limit=1)
-                    if parent_task:
-                        parent_task._compute_overall_progress()
+            self._queue_parent_rollups()
         return result
 
     def action_view_gantt(self):
@@ -241,7 +314,14 @@ class GanttTask(models.Model):
                 'description': 'Auto-created project for unlinked Gantt tasks'
             })
 
-        tasks_without_project.write({'project_id': default_project.id})
+        # Large backlogs are linked in chunks by the background job runner
+        if len(tasks_without_project) > JOB_THRESHOLD:
+            job = self.env['gantt.job'].enqueue(
+                'Link tasks to the default project', tasks_without_project,
+                '_link_to_project', {'project_id': default_project.id})
+            return job.action_notify_queued()
+
+        tasks_without_project._link_to_project(default_project.id)
 
         return {
             'type': 'ir.actions.client',
@@ -254,45 +334,28 @@ class GanttTask(models.Model):
             }
         }
 
-    def action_fix_project_links(self):
-        """Batch action to fix all tasks without project links"""
-        tasks_without_project = self.search([('project_id', '=', False)])
-
-        if not tasks_without_project:
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': 'No Issues Found',
-                    'message': 'All tasks are properly linked to projects.',
-                    'type': 'info',
-                    'sticky': False,
-                }
-            }
+    def _link_to_project(self, project_id):
+        tasks = self._with_bulk_mode()
+        tasks.write({'project_id': project_id})
+        tasks._post_bulk_summary('Linked to project', ['project_id'])
 
-        # Fix all unlinked tasks
-        default_project = self.env['project.project'].search([
-            ('name', '=', 'Default Gantt Project')
-        ], limit=1)
-
-        if not default_project:
-            default_project = self.env['project.project'].create({
-                'name': 'Default Gantt Project',
-                'description': 'Auto-created project for unlinked Gantt tasks'
-            })
+    @api.model
+    def _apply_task_values(self, items):
+        """
+        Writes or creates tasks from a list of {'task_id': id or False, 'vals': {...}}.
+        Used by wizard saves, directly or in chunks from a background job.
+        Runs in bulk mode and posts one summary per project.
+        """
+        model = self._with_bulk_mode()
+        updated = model.browse([item['task_id'] for item in items if item.get('task_id')]).exists()
+        existing = set(updated.ids)
+        for item in items:
+            if item.get('task_id') in existing:
+                model.browse(item['task_id']).write(item['vals'])
+        created = model.create([item['vals'] for item in items if not item.get('task_id')])
 
-        tasks_without_project.write({'project_id': default_project.id})
-
-        return {
-            'type': 'ir.actions.client',
-            'tag': 'display_notification',
-            'params': {
-                'title': 'Tasks Fixed',
-                'message': f'Successfully linked {len(tasks_without_project)} tasks to the default project.',
-                'type': 'success',
-                'sticky': False,
-            }
-        }
+        updated._post_bulk_summary('Updated from project details')
+        created._post_bulk_summary('Created from project details')
 
     @api.depends('end_date', 'progress')
     def _compute_is_delayed(self):
@@ -309,13 +372,37 @@ class GanttTask(models.Model):
             if record.start_date and record.end_date and record.start_date > record.end_date:
                 raise ValueError("End date must be after start date")
 
-    @api.depends('start_date', 'end_date')
+    @api.depends('start_date', 'end_date', 'calendar_id')
     def _compute_duration(self):
-        for rec in self:
-            if rec.start_date and rec.end_date:
-                rec.duration = (rec.end_date - rec.start_date).days + 1
-            else:
-                rec.duration = 0
+        for rec, duration in zip(self, compute_durations(self)):
+            rec.duration = duration
+
+    def _write_dates_batch(self, values):
+        """
+        Stores new dates for many tasks with a single UPDATE instead of one
+        write per task. ``values`` is a list of (task id, start, end); stored
+        fields depending on the dates are recomputed afterwards. The UPDATE
+        bypasses the ORM, so write access is checked here first.
+        """
+        if not values:
+            return
+        tasks = self.browse([value[0] for value in values])
+        tasks.check_access_rights('write')
+        tasks.check_access_rule('write')
+        self.flush_model(['start_date', 'end_date'])
+        execute_values(self.env.cr._obj, """
+            UPDATE gantt_task AS t
+               SET start_date = v.start_date::date,
+                   end_date = v.end_date::date,
+                   write_uid = %s,
+                   write_date = (now() at time zone 'UTC')
+              FROM (VALUES %%s) AS v(id, start_date, end_date)
+             WHERE t.id = v.id
+        """ % int(self.env.uid), values, page_size=1000)
+        tasks.invalidate_recordset(['start_date', 'end_date', 'write_uid', 'write_date'])
+        tasks.modified(['start_date', 'end_date'])
+        tasks._validate_fields(['start_date', 'end_date'])
+        tasks.flush_recordset()
 
     @api.constrains('progress')
     def _check_progress(self):
@@ -324,10 +411,12 @@ class GanttTask(models.Model):
                 raise ValueError("Progress must be between 0 and 100")
 
     @api.model
-    def get_gantt_data(self, domain=None, fields=None, wbs_root=None):
+    def get_gantt_data(self, domain=None, fields=None, wbs_root=None, filters=None):
         """
         Returns formatted data for Frappe Gantt library
         If wbs_root is provided, filters tasks for that specific project
+        With structured filters (see _gantt_filter_domain) the matching tasks
+        are returned with their ancestors, flagged as filter_context
         """
         tasks = []
         try:
@@ -343,7 +432,13 @@ class GanttTask(models.Model):
                 search_domain = search_domain + wbs_domain
                 _logger.info(f"Filtering tasks for WBS root: {wbs_root}")
 
-            records = self.search(search_domain)
+            if filters:
+                matched = self.search(expression.AND([search_domain, self._gantt_filter_domain(filters)]))
+                context_tasks = matched._get_filter_ancestors(search_domain)
+                records = (matched | context_tasks).sorted(key=lambda task: task.wbs)
+            else:
+                records = self.search(search_domain)
+                context_tasks = self.browse()
             _logger.info(f"Found {len(records)} gantt tasks")
 
             for record in records:
@@ -374,7 +469,10 @@ class GanttTask(models.Model):
                     'duration': record.duration,
                     'custom_class': f'priority-{record.priority}' if record.priority else '',
                     'lead': record.lead and [record.lead.id, record.lead.name] or False,
+                    'filter_context': record in context_tasks,
                 }
+                if task_data['filter_context']:
+                    task_data['custom_class'] += ' filter-context'
 
                 tasks.append(task_data)
 
@@ -386,11 +484,61 @@ class GanttTask(models.Model):
             return []
 
     @api.model
-    def get_gantt_data_for_project(self, wbs_root):
+    def get_assignee_directory(self, revision=None, query=None, offset=0, limit=ASSIGNEE_PAGE_SIZE):
+        """
+        Returns assignable users as [id, name] pairs for inline lead editing.
+        If the client already holds the current revision, only the token is
+        sent back. With a query, users are looked up through name_search so
+        large user bases never have to be downloaded in full.
+        """
+        current_revision = self._get_assignee_revision()
+
+        if query:
+            users = self.env['res.users'].name_search(query, limit=limit)
+            return {
+                'revision': current_revision,
+                'users': [[user_id, name] for user_id, name in users],
+                'has_more': len(users) >= limit,
+            }
+
+        if revision == current_revision and not offset:
+            return {'revision': current_revision, 'unchanged': True}
+
+        users, has_more = self._get_assignee_page(current_revision, offset, limit)
+        return {
+            'revision': current_revision,
+            'users': users,
+            'has_more': has_more,
+        }
+
+    @api.model
+    def _get_assignee_revision(self):
+        """Cheap token that changes whenever a user is added, renamed or archived"""
+        self.env['res.users'].flush_model(['active', 'partner_id'])
+        self.env['res.partner'].flush_model(['name'])
+        self.env.cr.execute("""
+            SELECT COUNT(u.id), GREATEST(MAX(u.write_date), MAX(p.write_date))
+              FROM res_users u
+              JOIN res_partner p ON p.id = u.partner_id
+        """)
+        count, last_write = self.env.cr.fetchone()
+        return f"{count}-{last_write.isoformat() if last_write else ''}"
+
+    @api.model
+    @tools.ormcache('self.env.uid', 'revision', 'offset', 'limit')
+    def _get_assignee_page(self, revision, offset, limit):
+        # The revision is part of the cache key, so stale pages are never served
+        records = self.env['res.users'].search_read(
+            [], ['name'], offset=offset, limit=limit + 1, order='name, id')
+        users = [[record['id'], record['name']] for record in records[:limit]]
+        return users, len(records) > limit
+
+    @api.model
+    def get_gantt_data_for_project(self, wbs_root, filters=None):
         """
         Specific method to get Gantt data for a project
         """
-        return self.get_gantt_data(wbs_root=wbs_root)
+        return self.get_gantt_data(wbs_root=wbs_root, filters=filters)
 
     @api.model
     def create_sample_data(self):
@@ -480,10 +628,8 @@ class GanttTask(models.Model):
             },
         ]
 
-        created_tasks = []
-        for task_data in sample_tasks:
-            task = self.create(task_data)
-            created_tasks.append(task)
+        created_tasks = self._with_bulk_mode().create(sample_tasks)
+        created_tasks._post_bulk_summary('Sample data created')
 
         return created_tasks
 
@@ -553,7 +699,7 @@ class GanttTaskProjectLinkWizard(models.TransientModel):
     def action_bulk_link_projects(self):
         """Bulk link tasks to projects"""
         # Get all unlinked tasks
-        unlinked_tasks = self.search([('project_id', '=', False)])
+        unlinked_tasks = self.env['gantt.task'].search([('project_id', '=', False)])
 
         if not unlinked_tasks:
             return {
@@ -570,7 +716,7 @@ class GanttTaskProjectLinkWizard(models.TransientModel):
         available_project = self.env['project.project'].search([], limit=1)
 
         if available_project:
-            unlinked_tasks.write({'project_id': available_project.id})
+            unlinked_tasks._link_to_project(available_project.id)
             return {
                 'type': 'ir.actions.client',
                 'tag': 'display_notification',
@@ -645,7 +791,7 @@ class GanttTaskProjectLinkWizard(models.TransientModel):
     @api.model
     def fix_all_project_links(self):
         """Fix all tasks that don't have project links"""
-        unlinked_tasks = self.search([('project_id', '=', False)])
+        unlinked_tasks = self.env['gantt.task'].search([('project_id', '=', False)])
 
         if not unlinked_tasks:
             return True
@@ -661,8 +807,13 @@ class GanttTaskProjectLinkWizard(models.TransientModel):
                 'description': 'Auto-created project for Gantt tasks'
             })
 
-        # Link all unlinked tasks
-        unlinked_tasks.write({'project_id': default_project.id})
+        # Link all unlinked tasks, in the background when there are many
+        if len(unlinked_tasks) > JOB_THRESHOLD:
+            self.env['gantt.job'].enqueue(
+                'Link tasks to the default project', unlinked_tasks,
+                '_link_to_project', {'project_id': default_project.id})
+            return True
+        unlinked_tasks._link_to_project(default_project.id)
 
         _logger.info(f"Fixed {len(unlinked_tasks)} tasks without project links")
         return True
\ No newline at end of file
@@ -0,0 +1,126 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class GanttTask(models.Model):
+    _inherit = 'gantt.task'
+
+    def move_subtree(self, new_wbs):
+        """
+        Moves or renumbers this task together with all its descendants, e.g.
+        "3.4" to "5.1" turns "3.4.2" into "5.1.2". Every WBS code of the
+        branch is rewritten by a single UPDATE and the rollups of the old and
+        new roots are queued once, all within the current transaction.
+        Dependencies reference task ids, which do not change.
+        """
+        self.ensure_one()
+        # The branch is renumbered with raw SQL, write access is checked up front
+        self.check_access_rights('write')
+        old_wbs = self.wbs
+        new_wbs = self._clean_wbs_code(new_wbs)
+        if new_wbs == old_wbs:
+            return self
+        if new_wbs.startswith(f'{old_wbs}.'):
+            raise UserError(f"Task {old_wbs} cannot be moved below itself.")
+
+        self.flush_model()
+        # Lock the branch so concurrent edits wait for the move to finish
+        self.env.cr.execute("""
+            SELECT id FROM gantt_task
+             WHERE wbs = %s OR wbs LIKE %s
+               FOR UPDATE
+        """, (old_wbs, f'{old_wbs}.%'))
+        self.browse([row[0] for row in self.env.cr.fetchall()]).check_access_rule('write')
+        self._check_wbs_available(new_wbs, ignore_wbs=old_wbs)
+        self._check_wbs_parent_exists(new_wbs)
+
+        self.env.cr.execute("""
+            UPDATE gantt_task
+               SET wbs = %s || substr(wbs, %s),
+                   wbs_root = split_part(%s, '.', 1),
+                   write_uid = %s,
+                   write_date = (now() at time zone 'UTC')
+             WHERE wbs = %s OR wbs LIKE %s
+         RETURNING id
+        """, (new_wbs, len(old_wbs) + 1, new_wbs, self.env.uid, old_wbs, f'{old_wbs}.%'))
+        moved = self.browse([row[0] for row in self.env.cr.fetchall()])
+        moved.invalidate_recordset(['wbs', 'wbs_root', 'write_uid', 'write_date'])
+        moved.modified(['wbs'])
+        moved._validate_fields(['wbs'])
+        moved.flush_recordset()
+
+        # Roll up the project the branch left and the one it joined
+        moved._queue_parent_rollups({old_wbs.split('.')[0], new_wbs.split('.')[0]})
+
+        moved._with_bulk_mode()._post_bulk_summary(f'Moved from {old_wbs} to {new_wbs}', ['wbs'])
+        _logger.info(f"Moved WBS subtree {old_wbs} to {new_wbs} ({len(moved)} tasks)")
+        return self
+
+    @api.model
+    def _clean_wbs_code(self, wbs):
+        wbs = (wbs or '').strip()
+        if not wbs or '' in wbs.split('.'):
+            raise UserError(f'"{wbs}" is not a valid WBS code.')
+        return wbs
+
+    @api.model
+    def _check_wbs_available(self, wbs, ignore_wbs=None):
+        """Raises if a task already uses this WBS code or one below it, outside ``ignore_wbs``'s branch"""
+        query = """
+            SELECT wbs FROM gantt_task
+             WHERE (wbs = %s OR wbs LIKE %s)
+        """
+        params = [wbs, f'{wbs}.%']
+        if ignore_wbs:
+            query += " AND NOT (wbs = %s OR wbs LIKE %s)"
+            params += [ignore_wbs, f'{ignore_wbs}.%']
+        self.env.cr.execute(query + " LIMIT 1", params)
+        conflict = self.env.cr.fetchone()
+        if conflict:
+            raise UserError(f"WBS {wbs} is already used (task {conflict[0]}).")
+
+    @api.model
+    def _check_wbs_parent_exists(self, wbs):
+        """Raises unless ``wbs`` is a root or its parent task exists, a branch must not be orphaned"""
+        if '.' not in wbs:
+            return
+        parent_wbs = wbs.rsplit('.', 1)[0]
+        self.env.cr.execute("SELECT 1 FROM gantt_task WHERE wbs = %s LIMIT 1", (parent_wbs,))
+        if not self.env.cr.fetchone():
+            raise UserError(f"WBS {parent_wbs} does not exist, create it before moving tasks below it.")
+
+    def action_open_move_wizard(self):
+        self.ensure_one()
+        return {
+            'name': 'Move / Renumber',
+            'type': 'ir.actions.act_window',
+            'res_model': 'gantt.task.move.wizard',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': {'default_task_id': self.id, 'default_new_wbs': self.wbs},
+        }
+
+
+class GanttTaskMoveWizard(models.TransientModel):
+    _name = 'gantt.task.move.wizard'
+    _description = 'Move or Renumber a WBS Branch'
+
+    task_id = fields.Many2one('gantt.task', string='Task', required=True)
+    current_wbs = fields.Char(related='task_id.wbs', string='Current WBS')
+    new_wbs = fields.Char('New WBS', required=True)
+    subtree_count = fields.Integer('Tasks Moved', compute='_compute_subtree_count')
+
+    @api.depends('task_id')
+    def _compute_subtree_count(self):
+        for wizard in self:
+            wbs = wizard.task_id.wbs
+            wizard.subtree_count = self.env['gantt.task'].search_count(
+                ['|', ('wbs', '=', wbs), ('wbs', '=like', f'{wbs}.%')]) if wbs else 0
+
+    def action_move(self):
+        self.ensure_one()
+        self.task_id.move_subtree(self.new_wbs)
+        return {'type': 'ir.actions.act_window_close'}
@@ -0,0 +1,147 @@
+from odoo import models, api, tools
+import logging
+
+import numpy as np
+import pytz
+
+from .schedule_tools import (
+    CALENDAR_OFFSET, CALENDAR_SIZE, add_working_days, count_working_days, from_days,
+    group_by_calendar, table_index, to_days,
+)
+
+_logger = logging.getLogger(__name__)
+
+# Calendar fields the working days depend on
+CALENDAR_SCHEDULE_FIELDS = {'attendance_ids', 'global_leave_ids', 'leave_ids', 'tz'}
+
+
+class ResourceCalendar(models.Model):
+    _inherit = 'resource.calendar'
+
+    @tools.ormcache('self.id')
+    def _get_workday_prefix_sums(self):
+        """
+        Precomputes the calendar once into a prefix-sum array where entry i is
+        the number of working days before CALENDAR_FIRST_DAY + i. Working days
+        are the weekdays with attendances, minus the global leaves, whose
+        days are taken in the calendar's timezone.
+        """
+        self.ensure_one()
+        calendar = self.sudo()
+        weekdays = {int(day) for day in calendar.attendance_ids.mapped('dayofweek')}
+
+        day_numbers = np.arange(CALENDAR_SIZE, dtype=np.int64) + CALENDAR_OFFSET
+        # 1970-01-01 was a Thursday, shift so that Monday is 0 like dayofweek
+        workday = np.isin((day_numbers + 3) % 7, list(weekdays))
+
+        leaves = calendar.global_leave_ids.filtered(lambda leave: leave.date_from and leave.date_to)
+        if leaves:
+            # Leave bounds are stored in UTC, a leave from local midnight must not start the day before
+            tz = pytz.timezone(calendar.tz or 'UTC')
+            local_day = lambda value: pytz.utc.localize(value).astimezone(tz).date()
+            holidays = np.zeros(CALENDAR_SIZE + 1, dtype=np.int64)
+            np.add.at(holidays, table_index(to_days(leaves.mapped(lambda l: local_day(l.date_from)))), 1)
+            np.add.at(holidays, table_index(to_days(leaves.mapped(lambda l: local_day(l.date_to)))) + 1, -1)
+            workday &= np.cumsum(holidays)[:CALENDAR_SIZE] == 0
+
+        prefix = np.zeros(CALENDAR_SIZE + 1, dtype=np.int64)
+        np.cumsum(workday, out=prefix[1:])
+        prefix.setflags(write=False)
+        return prefix
+
+    def _recompute_task_durations(self):
+        """
+        Drops the cached workday tables and recomputes the stored duration
+        of the Gantt tasks on these calendars, which depends on them.
+        """
+        self.clear_caches()
+        calendars = self.exists()
+        if not calendars:
+            return
+        tasks = self.env['gantt.task'].sudo().search([('calendar_id', 'in', calendars.ids)])
+        if tasks:
+            self.env.add_to_compute(tasks._fields['duration'], tasks)
+            tasks.flush_recordset(['duration'])
+            _logger.info(f"Recomputed the duration of {len(tasks)} Gantt tasks after a calendar change")
+
+    def write(self, vals):
+        result = super().write(vals)
+        if CALENDAR_SCHEDULE_FIELDS & set(vals):
+            self._recompute_task_durations()
+        return result
+
+
+class ResourceCalendarAttendance(models.Model):
+    _inherit = 'resource.calendar.attendance'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records.calendar_id._recompute_task_durations()
+        return records
+
+    def write(self, vals):
+        calendars = self.calendar_id
+        result = super().write(vals)
+        (calendars | self.calendar_id)._recompute_task_durations()
+        return result
+
+    def unlink(self):
+        calendars = self.calendar_id
+        result = super().unlink()
+        calendars._recompute_task_durations()
+        return result
+
+
+class ResourceCalendarLeaves(models.Model):
+    _inherit = 'resource.calendar.leaves'
+
+    def _get_global_calendars(self):
+        # Only global leaves are in the workday tables, resource leaves (time off) are not
+        return self.filtered(lambda leave: not leave.resource_id).calendar_id
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._get_global_calendars()._recompute_task_durations()
+        return records
+
+    def write(self, vals):
+        calendars = self._get_global_calendars()
+        result = super().write(vals)
+        (calendars | self._get_global_calendars())._recompute_task_durations()
+        return result
+
+    def unlink(self):
+        calendars = self._get_global_calendars()
+        result = super().unlink()
+        calendars._recompute_task_durations()
+        return result
+
+
+class GanttTask(models.Model):
+    _inherit = 'gantt.task'
+
+    def action_shift_working_days(self, days):
+        """
+        Shifts the tasks by a number of working days of their own calendar,
+        keeping each task's working duration. New dates are computed per
+        calendar with array lookups and stored in one batched update.
+        """
+        values = []
+        scheduled = self.filtered(lambda task: task.start_date and task.end_date)
+        for calendar, tasks in group_by_calendar(scheduled).items():
+            starts = to_days(tasks.mapped('start_date'))
+            ends = to_days(tasks.mapped('end_date'))
+            if calendar:
+                prefix = calendar._get_workday_prefix_sums()
+                durations = np.maximum(count_working_days(prefix, starts, ends), 1)
+                new_starts = add_working_days(prefix, starts, days)
+                new_ends = add_working_days(prefix, new_starts, durations - 1)
+            else:
+                new_starts = starts + days
+                new_ends = ends + days
+            values.extend(zip(tasks.ids, from_days(new_starts), from_days(new_ends)))
+        self._write_dates_batch(values)
+        scheduled._post_bulk_summary(f'Shifted by {days} working days', ['start_date', 'end_date'])
+        return True
@@ -2,6 +2,9 @@ from odoo import models, fields, api
 from datetime import date, timedelta
 import logging
 
+from .gantt_job import JOB_THRESHOLD
+from .schedule_tools import compute_durations
+
 _logger = logging.getLogger(__name__)
 
 class ProjectDetailsWizard(models.TransientModel):
@@ -23,6 +26,10 @@ class ProjectDetailsWizard(models.TransientModel):
     project_start_date = fields.Date('Project Start Date', compute='_compute_project_dates')
     project_end_date = fields.Date('Project End Date', compute='_compute_project_dates')
     project_duration = fields.Integer('Project Duration', compute='_compute_project_duration')
+    planned_value_percent = fields.Float('Planned (%)', compute='_compute_earned_value')
+    earned_value_percent = fields.Float('Earned (%)', compute='_compute_earned_value')
+    schedule_performance_index = fields.Float('SPI', compute='_compute_earned_value', digits=(16, 2),
+                                              help="Earned value divided by planned value at today's date")
 
     @api.model
     def default_get(self, fields_list):
@@ -85,6 +92,7 @@ class ProjectDetailsWizard(models.TransientModel):
                 'priority': task.priority or 'medium',
                 'dependencies': task.dependencies or '',
                 'description': task.description or '',
+                'calendar_id': task.calendar_id.id,
             }))
         self.task_line_ids = task_lines
 
@@ -152,6 +160,17 @@ class ProjectDetailsWizard(models.TransientModel):
             else:
                 wizard.project_duration = 0
 
+    @api.depends('wbs_root')
+    def _compute_earned_value(self):
+        for wizard in self:
+            metrics = {}
+            if wizard.wbs_root:
+                metrics = self.env['gantt.task'].get_earned_value(wizard.wbs_root)['projects'].get(wizard.wbs_root, {})
+            budget = metrics.get('budget')
+            wizard.planned_value_percent = metrics['planned_value'] * 100.0 / budget if budget else 0.0
+            wizard.earned_value_percent = metrics['earned_value'] * 100.0 / budget if budget else 0.0
+            wizard.schedule_performance_index = metrics.get('spi') or 0.0
+
     def action_create_task(self):
         if not self.project_id or not self.project_id.id:
             return {
@@ -266,26 +285,31 @@ class ProjectDetailsWizard(models.TransientModel):
             }
 
         prefix = f'{self.wbs_root}.'
+        items = []
         for line in self.task_line_ids:
             full_wbs = f"{prefix}{line.wbs}"
             vals = {
                 'name': line.name,
                 'wbs': full_wbs,
                 'lead': line.lead.id if line.lead else False,
-                'start_date': line.start_date,
-                'end_date': line.end_date,
+                'start_date': fields.Date.to_string(line.start_date),
+                'end_date': fields.Date.to_string(line.end_date),
                 'progress': line.progress,
                 'priority': line.priority,
                 'dependencies': line.dependencies or '',
                 'description': line.description or '',
+                'calendar_id': line.calendar_id.id,
                 'project_id': self.project_id.id,
             }
-            if line.original_task_id:
-                existing_task = self.env['gantt.task'].browse(line.original_task_id)
-                if existing_task.exists():
-                    existing_task.write(vals)
-            else:
-                self.env['gantt.task'].create(vals)
+            items.append({'task_id': line.original_task_id.id, 'vals': vals})
+
+        # Large saves go to the background job runner instead of blocking the request
+        if len(items) > JOB_THRESHOLD:
+            job = self.env['gantt.job'].enqueue_items(
+                f'Save project {self.wbs_root}', 'gantt.task', '_apply_task_values', items)
+            return job.action_notify_queued()
+
+        self.env['gantt.task']._apply_task_values(items)
         return {'type': 'ir.actions.act_window_close'}
 
     def action_refresh(self):
@@ -313,6 +337,7 @@ class ProjectTaskLine(models.TransientModel):
     start_date = fields.Date('Start Date', required=True)
     end_date = fields.Date('End Date', required=True)
     duration = fields.Integer(string='Days', compute='_compute_duration')
+    calendar_id = fields.Many2one('resource.calendar', string='Working Calendar')
     progress = fields.Float('Progress (%)', default=0)
     dependencies = fields.Char('Dependencies')
     description = fields.Text('Description')
@@ -324,13 +349,10 @@ class ProjectTaskLine(models.TransientModel):
         ('urgent', 'Urgent')
     ], default='medium')
 
-    @api.depends('start_date', 'end_date')
+    @api.depends('start_date', 'end_date', 'calendar_id')
     def _compute_duration(self):
-        for rec in self:
-            if rec.start_date and rec.end_date:
-                rec.duration = (rec.end_date - rec.start_date).days + 1
-            else:
-                rec.duration = 0
+        for rec, duration in zip(self, compute_durations(self)):
+            rec.duration = duration
 
     @api.depends('end_date', 'progress')
     def _compute_is_delayed(self):
@@ -0,0 +1,277 @@
+"""
+Array helpers shared by the scheduling features. Dates are handled as day
+numbers since EPOCH so whole schedules fit in NumPy integer arrays.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+
+EPOCH = date(1970, 1, 1)
+
+# Range covered by the precomputed workday tables, dates outside are clamped
+CALENDAR_FIRST_DAY = date(1990, 1, 1)
+CALENDAR_LAST_DAY = date(2150, 1, 1)
+CALENDAR_OFFSET = (CALENDAR_FIRST_DAY - EPOCH).days
+CALENDAR_SIZE = (CALENDAR_LAST_DAY - CALENDAR_FIRST_DAY).days
+
+
+def table_index(days):
+    return np.clip(np.asarray(days, dtype=np.int64) - CALENDAR_OFFSET, 0, CALENDAR_SIZE - 1)
+
+
+def count_working_days(prefix, starts, ends):
+    """
+    Working days between start and end, both included. ``prefix`` is a
+    workday prefix-sum table and dates are day numbers since 1970-01-01.
+    """
+    return prefix[table_index(ends) + 1] - prefix[table_index(starts)]
+
+
+def add_working_days(prefix, days, offsets, workdays=None):
+    """
+    Moves each day by a number of working days. A non-working start is first
+    snapped forward to the next working day, so an offset of 0 does just that.
+    With the ``workdays`` table of the same calendar the n-th working day is
+    looked up directly instead of searched in ``prefix``.
+    """
+    target = prefix[table_index(days)] + np.asarray(offsets, dtype=np.int64)
+    target = np.clip(target, 0, prefix[-1] - 1)
+    if workdays is not None:
+        return workdays[target] + CALENDAR_OFFSET
+    return np.searchsorted(prefix, target + 1, side='left') - 1 + CALENDAR_OFFSET
+
+
+def cumulative_work(prefix, starts, ends, days):
+    """
+    Working days of the tasks elapsed by the end of each of ``days``, summed
+    over the tasks, each task running from its start to its end day. Without
+    a ``prefix`` table every calendar day is a working day. Only the queried
+    days are evaluated, by searching the sorted starts and ends, so the cost
+    does not depend on the date range the tasks span.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    if prefix is None:
+        before, through = (lambda values: values), (lambda values: values + 1)
+    else:
+        before, through = (lambda values: prefix[table_index(values)]), (lambda values: prefix[table_index(values) + 1])
+    start_keys = before(starts)
+    durations = through(ends) - start_keys
+
+    start_order = np.argsort(starts, kind='stable')
+    end_order = np.argsort(ends, kind='stable')
+    started = np.searchsorted(starts[start_order], days, side='right')
+    finished = np.searchsorted(ends[end_order], days, side='left')
+    started_keys = np.r_[0, np.cumsum(start_keys[start_order])]
+    finished_keys = np.r_[0, np.cumsum(start_keys[end_order])]
+    finished_work = np.r_[0, np.cumsum(durations[end_order])]
+    # Finished tasks count whole, running ones up to the queried day
+    return finished_work[finished] + through(days) * (started - finished) \
+        - (started_keys[started] - finished_keys[finished])
+
+
+def workday_table(prefix):
+    """Table index of each working day in order, the inverse of a prefix-sum table"""
+    return np.flatnonzero(np.diff(prefix))
+
+
+def compute_durations(records):
+    """
+    Duration in days of each record with start_date, end_date and calendar_id,
+    in the order of the recordset. Records are grouped per calendar and each
+    group costs two lookups in that calendar's prefix-sum table.
+    """
+    durations = [0] * len(records)
+    groups = {}
+    for position, record in enumerate(records):
+        if record.start_date and record.end_date:
+            groups.setdefault(record.calendar_id, []).append((position, record))
+    for calendar, members in groups.items():
+        starts = to_days(record.start_date for _position, record in members)
+        ends = to_days(record.end_date for _position, record in members)
+        if calendar:
+            values = count_working_days(calendar._get_workday_prefix_sums(), starts, ends)
+        else:
+            values = ends - starts + 1
+        for (position, _record), value in zip(members, values.tolist()):
+            durations[position] = value
+    return durations
+
+
+def group_by_calendar(records):
+    groups = {}
+    for record in records:
+        groups.setdefault(record.calendar_id, []).append(record.id)
+    return {calendar: records.browse(ids) for calendar, ids in groups.items()}
+
+
+def to_days(dates):
+    return np.array([(value - EPOCH).days for value in dates], dtype=np.int64)
+
+
+def from_days(days):
+    return [EPOCH + timedelta(days=int(day)) for day in days]
+
+
+def parse_dependency_edges(ids, dependencies):
+    """
+    Turns the comma-separated predecessor ids of each task into edge arrays
+    of (predecessor, successor) positions in ``ids``, which must be sorted.
+    References to tasks outside ``ids`` are ignored.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    preds, succs = [], []
+    for position, value in enumerate(dependencies):
+        for ref in (value or '').split(','):
+            ref = ref.strip()
+            if ref.isdigit():
+                preds.append(int(ref))
+                succs.append(position)
+    if not preds:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    preds = np.array(preds, dtype=np.int64)
+    succs = np.array(succs, dtype=np.int64)
+    found = np.searchsorted(ids, preds)
+    found = np.minimum(found, len(ids) - 1)
+    valid = (ids[found] == preds) & (found != succs)
+    return found[valid], succs[valid]
+
+
+def dependency_levels(n, preds, succs):
+    """
+    Splits a dependency graph of ``n`` tasks into topological levels with
+    Kahn's algorithm, one NumPy step per level. Returns the task positions
+    of each level, the edges ending in each level as (preds, succs) arrays,
+    and a mask of tasks in cycles, which are left out of every level.
+    """
+    indegree = np.bincount(succs, minlength=n)
+    order = np.argsort(preds, kind='stable')
+    sorted_preds, sorted_succs = preds[order], succs[order]
+    bounds = np.searchsorted(sorted_preds, np.arange(n + 1))
+
+    levels = []
+    placed = np.zeros(n, dtype=bool)
+    frontier = np.flatnonzero(indegree == 0)
+    while len(frontier):
+        levels.append(frontier)
+        placed[frontier] = True
+        # Outgoing edges of the whole frontier at once
+        counts = bounds[frontier + 1] - bounds[frontier]
+        starts = np.repeat(bounds[frontier] - np.cumsum(counts) + counts, counts)
+        targets = sorted_succs[starts + np.arange(counts.sum())]
+        np.subtract.at(indegree, targets, 1)
+        frontier = np.unique(targets[indegree[targets] == 0])
+
+    level_of = np.full(n, -1, dtype=np.int64)
+    for index, level in enumerate(levels):
+        level_of[level] = index
+    kept = placed[preds] & placed[succs]
+    edge_level = level_of[succs[kept]]
+    order = np.argsort(edge_level, kind='stable')
+    cuts = np.searchsorted(edge_level[order], np.arange(1, len(levels)))
+    level_edges = list(zip(np.split(preds[kept][order], cuts), np.split(succs[kept][order], cuts)))
+    return levels, level_edges, ~placed
+
+
+def place_tasks(prefixes, calendars, starts, durations, workdays=None):
+    """
+    Start and end days of tasks requested to start on ``starts`` and last
+    ``durations`` days. Tasks with a calendar (index into ``prefixes``, -1
+    for none) start on the next working day and count working days.
+    ``starts`` and ``durations`` may have a leading axis of samples, the
+    last axis matching ``calendars``. ``workdays`` optionally holds the
+    workday_table of each calendar, for repeated placements.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    durations = np.maximum(np.asarray(durations, dtype=np.int64), 1)
+    new_starts = starts.copy()
+    new_ends = starts + durations - 1
+    for calendar in np.unique(calendars):
+        if calendar < 0:
+            continue
+        mask = calendars == calendar
+        prefix = prefixes[calendar]
+        table = workdays[calendar] if workdays is not None else None
+        new_starts[..., mask] = add_working_days(prefix, starts[..., mask], 0, table)
+        new_ends[..., mask] = add_working_days(prefix, new_starts[..., mask], durations[..., mask] - 1, table)
+    return new_starts, new_ends
+
+
+def group_edges_by_successor(preds, succs):
+    """
+    Sorts edges by successor for maximum.reduceat: returns (preds, distinct
+    successors, start of each successor's group).
+    """
+    order = np.argsort(succs, kind='stable')
+    preds, succs = preds[order], succs[order]
+    starts = np.flatnonzero(np.r_[True, succs[1:] != succs[:-1]])
+    return preds, succs[starts], starts
+
+
+def sample_triangular(rng, low, mode, high, size):
+    """
+    Draws ``size`` rows of triangular samples by inverting the CDF, so tasks
+    with low == high simply keep that value.
+    """
+    low, mode, high = (np.asarray(value, dtype=np.float64) for value in (low, mode, high))
+    span = high - low
+    uncertain = span > 0
+    split = np.divide(mode - low, span, out=np.zeros_like(span), where=uncertain)
+    u = rng.random((size, len(low)))
+    left = low + np.sqrt(u * span * (mode - low))
+    right = high - np.sqrt((1 - u) * span * (high - mode))
+    return np.where(u < split, left, right)
+
+
+def simulate_schedule(schedule, low, mode, high, simulations, seed=None, chunk_size=1000):
+    """
+    Monte Carlo forward pass of a schedule loaded by gantt.schedule.sandbox.
+    Each simulation draws every duration from a triangular distribution,
+    places the tasks no earlier than planned and pushes finish-to-start
+    successors level by level, over a whole chunk of simulations at once.
+    Critical tasks are then traced back from the project finish through the
+    predecessors that drove each start. Only tasks in the optional
+    ``work`` mask define the project finish. Returns the project finish day
+    of every simulation and how many times each task was critical.
+    Pure NumPy, so it can run in a worker process.
+    """
+    rng = np.random.default_rng(seed)
+    planned = schedule['start']
+    calendars = schedule['calendar']
+    prefixes = schedule['prefixes']
+    workdays = [workday_table(prefix) for prefix in prefixes]
+    levels = []
+    for preds, succs, starts in schedule['level_edges']:
+        groups = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(preds)]))
+        pred_order = np.argsort(preds, kind='stable')
+        pred_starts = np.flatnonzero(np.r_[True, preds[pred_order][1:] != preds[pred_order][:-1]])
+        levels.append((preds, succs, starts, groups, pred_order, preds[pred_order][pred_starts], pred_starts))
+
+    finishes = []
+    critical_counts = np.zeros(len(planned), dtype=np.int64)
+    for offset in range(0, simulations, chunk_size):
+        size = min(chunk_size, simulations - offset)
+        durations = np.rint(sample_triangular(rng, low, mode, high, size)).astype(np.int64)
+        start, end = place_tasks(prefixes, calendars, np.broadcast_to(planned, durations.shape), durations, workdays)
+        required_by_level = []
+        for preds, succs, starts, *_rest in levels:
+            required = np.maximum.reduceat(end[:, preds] + 1, starts, axis=1)
+            required_by_level.append(required)
+            wanted = np.maximum(start[:, succs], required)
+            start[:, succs], end[:, succs] = place_tasks(
+                prefixes, calendars[succs], wanted, durations[:, succs], workdays)
+
+        work = schedule.get('work')
+        finish = (end if work is None else end[:, work]).max(axis=1)
+        critical = end == finish[:, None]
+        if work is not None:
+            critical &= work
+        for level, required in zip(reversed(levels), reversed(required_by_level)):
+            preds, succs, starts, groups, pred_order, pred_unique, pred_starts = level
+            driven = critical[:, succs] & (required >= planned[succs])
+            edge_critical = driven[:, groups] & (end[:, preds] + 1 == required[:, groups])
+            critical[:, pred_unique] |= np.logical_or.reduceat(edge_critical[:, pred_order], pred_starts, axis=1)
+        finishes.append(finish)
+        critical_counts += critical.sum(axis=0)
+    return np.concatenate(finishes), critical_counts
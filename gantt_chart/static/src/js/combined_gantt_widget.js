@@ -7,12 +7,32 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
     const ListView = require('web.ListView');
     const FormController = require('web.FormController');
     const ListController = require('web.ListController');
-    const { Gantt } = window;
     const QWeb = core.qweb;
     const ajax = require('web.ajax');
 
+    // Delay before a burst of edits on the same task is sent as one write
+    const WRITE_COALESCE_DELAY = 400;
+    // Delay after the last keystroke before the name search is sent
+    const SEARCH_DEBOUNCE_DELAY = 300;
+    // The cached assignee list is used as is for this long before its revision is checked again
+    const USER_DIRECTORY_CHECK_INTERVAL = 60000;
+    // Export libraries are only loaded when an export first runs, from the CDN: the browser
+    // export needs internet access, Export All builds the workbooks on the server instead.
+    // URLs are tried in order.
+    const EXPORT_LIBS = {
+        ExcelJS: [
+            'https://cdnjs.cloudflare.com/ajax/libs/exceljs/4.3.0/exceljs.min.js',
+        ],
+    };
+
     const CombinedGanttAction = AbstractAction.extend({
         template: 'CombinedGanttWidget',
+        // Loaded when the action opens instead of with every backend page
+        jsLibs: ['/gantt_chart/static/src/lib/frappe-gantt.min.js'],
+        cssLibs: [
+            '/gantt_chart/static/src/lib/frappe-gantt.css',
+            '/gantt_chart/static/src/css/combined_gantt.css',
+        ],
 
         init: function (parent, action) {
             this._super.apply(this, arguments);
@@ -24,6 +44,17 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
             this.allTasks = [];
             this.project_name = 'Project Gantt Chart';
             this.availableProjects = []; // Store all available projects
+            this.userDirectory = null; // Cached assignee list, reused across edits
+            this.pendingWrites = new Map(); // Task id -> queued values not yet sent
+            this.confirmedValues = new Map(); // Task id -> last values known to be on the server
+            this.writeChains = new Map(); // Task id -> promise of the write in flight
+            this.waitingSends = new Set(); // Writes chained behind one in flight, not sent yet
+            this.portfolioMode = false; // One summary bar per WBS root instead of task detail
+            this.filters = {}; // Structured filters applied server-side
+        },
+
+        willStart: function () {
+            return Promise.all([this._super.apply(this, arguments), ajax.loadLibs(this)]);
         },
 
         start: function () {
@@ -98,115 +129,41 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
                     console.log('Loading data for specific project:', this.wbs_root);
                     this._loadTasksForProject(this.wbs_root);
                 } else {
-                    // Load all tasks and show project selection
-                    this._setupListView();
+                    // Show one summary bar per project, details load on drill-down
+                    this._showPortfolio();
                 }
             });
         },
 
         _loadAllProjects: function () {
-            // Load all tasks to identify available projects
+            // Project list and date spans are aggregated server-side, one row per WBS root
             return this._rpc({
                 model: 'gantt.task',
-                method: 'search_read',
-                args: [[], ['wbs', 'name', 'start_date', 'end_date', 'lead', 'progress', 'priority', 'duration']],
-            }).then((records) => {
-                console.log('Raw loaded records:', records);
-                this.allTasks = records;
-                this.availableProjects = this._extractProjects(records);
-                console.log('Extracted available projects:', this.availableProjects);
-
-                // Filter out projects that don't have valid root tasks
-                this.availableProjects = this.availableProjects.filter(project => {
-                    const hasRootTask = records.some(task => task.wbs === project.wbs_root);
-                    console.log(`Project ${project.wbs_root} has root task:`, hasRootTask);
-                    return hasRootTask;
-                });
-
-                console.log('Final filtered projects:', this.availableProjects);
-                return records;
+                method: 'get_portfolio_summary',
+                kwargs: { granularity: 'month', filters: this.filters },
+            }).then((projects) => {
+                this.availableProjects = projects;
+                return projects;
             }).catch((error) => {
                 console.error('Error loading all projects:', error);
                 return [];
             });
         },
 
-        _extractProjects: function (tasks) {
-            const projectMap = new Map();
-
-            console.log('Extracting projects from tasks:', tasks);
-
-            tasks.forEach(task => {
-                if (task.wbs) {
-                    const wbsRoot = task.wbs.split('.')[0];
-                    console.log(`Processing task: WBS="${task.wbs}", Root="${wbsRoot}", Name="${task.name}"`);
-
-                    if (!projectMap.has(wbsRoot)) {
-                        // Find the root task (task with WBS equal to wbsRoot)
-                        const rootTask = tasks.find(t => t.wbs === wbsRoot);
-
-                        // Only create project entry if root task exists
-                        if (rootTask) {
-                            console.log(`Found root task for project ${wbsRoot}:`, rootTask);
-                            projectMap.set(wbsRoot, {
-                                wbs_root: wbsRoot,
-                                name: rootTask.name,
-                                task_count: 0,
-                                start_date: null,
-                                end_date: null,
-                                root_task_id: rootTask.id
-                            });
-                        } else {
-                            console.log(`No root task found for WBS root "${wbsRoot}" - skipping`);
-                            return; // Skip this task if no root task exists
-                        }
-                    }
-
-                    const project = projectMap.get(wbsRoot);
-                    if (project) {
-                        project.task_count++;
-
-                        // Update date range
-                        if (task.start_date) {
-                            if (!project.start_date || task.start_date < project.start_date) {
-                                project.start_date = task.start_date;
-                            }
-                        }
-                        if (task.end_date) {
-                            if (!project.end_date || task.end_date > project.end_date) {
-                                project.end_date = task.end_date;
-                            }
-                        }
-                    }
-                }
-            });
-
-            const result = Array.from(projectMap.values()).sort((a, b) => {
-                // Sort numerically if both are numbers, otherwise alphabetically
-                const aNum = parseInt(a.wbs_root);
-                const bNum = parseInt(b.wbs_root);
-                if (!isNaN(aNum) && !isNaN(bNum)) {
-                    return aNum - bNum;
-                }
-                return a.wbs_root.localeCompare(b.wbs_root);
-            });
-
-            console.log('Final extracted projects:', result);
-            return result;
-        },
-
         _loadTasksForProject: function (wbsRoot) {
             // Load tasks specifically for this project
             this._rpc({
                 model: 'gantt.task',
                 method: 'get_gantt_data_for_project',
                 args: [wbsRoot],
+                kwargs: { filters: this.filters },
             }).then((tasks) => {
                 console.log('Loaded tasks for project', wbsRoot, ':', tasks);
                 this.allTasks = tasks;
                 this.tasks = tasks;
                 this._renderTaskList(tasks);
                 this._renderGanttWithFilteredTasks();
+                this._loadFacets();
             }).catch((error) => {
                 console.error('Error loading project tasks:', error);
                 this._showGanttError('Error loading project data: ' + error.message);
@@ -216,9 +173,9 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
         _setupLeftPanel: function () {
             const context = this.action && this.action.context ? this.action.context : {};
 
-            // If we have a specific project, don't show the general list view
+            // Without a specific project, start on the portfolio overview
             if (!this.wbs_root) {
-                this._setupListView(context);
+                this.portfolioMode = true;
             }
         },
 
@@ -251,47 +208,160 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
             });
         },
 
-        _setupListView: function () {
-            const listContainer = this.$('.left-panel .list-container');
+        _showPortfolio: function () {
+            this.portfolioMode = true;
+            this.wbs_root = null;
+            this.allTasks = [];
+            this.tasks = [];
+            this._renderPortfolioTable(this.availableProjects);
+            this._renderPortfolioGantt();
+            this._loadFacets();
+        },
 
-            const context = this.action && this.action.context ? this.action.context : {};
-            const projectId = context.default_project_id;
+        _readFilterControls: function () {
+            const bar = this.$('.gantt-filter-bar');
+            const filters = {};
+            const search = bar.find('.filter-search').val();
+            const lead = bar.find('.filter-lead').val();
+            const priority = bar.find('.filter-priority').val();
+            const progress = bar.find('.filter-progress').val();
+            if (search && search.trim()) filters.search = search.trim();
+            if (lead !== '' && lead !== undefined) filters.lead_ids = [parseInt(lead) || false];
+            if (priority) filters.priority = [priority];
+            if (progress) filters.progress_bucket = [progress];
+            if (bar.find('.filter-delayed').is(':checked')) filters.delayed = true;
+            return filters;
+        },
 
-            if (projectId) {
-                this.tasks = this.tasks.filter(task => task.project_id[0] === projectId);
-            }
+        _onFiltersChanged: function () {
+            this.filters = this._readFilterControls();
+            this._refreshData();
+        },
 
-            this._rpc({
-                model: 'gantt.task',
-                method: 'search_read',
-                args: [[], ['wbs', 'name', 'start_date', 'end_date', 'lead', 'progress', 'priority', 'duration']],
-            }).then((records) => {
-                console.log('Fetched tasks:', records);
-                this.tasks = records;
-                this.allTasks = records;
-                this._renderTaskList(records);
-
-                // Initialize Gantt with first project if no specific root is set
-                if (!this.wbs_root && records.length > 0) {
-                    const groupedTasks = this._groupTasksByWBS(records);
-                    const wbsRoots = Object.keys(groupedTasks).sort();
-                    if (wbsRoots.length > 0) {
-                        this.wbs_root = wbsRoots[0];
-                        console.log('Setting default wbs_root to:', this.wbs_root);
-                    }
-                }
+        _clearFilters: function () {
+            const bar = this.$('.gantt-filter-bar');
+            bar.find('.filter-search').val('');
+            bar.find('select').val('');
+            bar.find('.filter-delayed').prop('checked', false);
+            this._onFiltersChanged();
+        },
 
-                this._renderGanttWithFilteredTasks();
+        _loadFacets: function () {
+            // Counts per option come from one server-side scan of the current scope
+            return this._rpc({
+                model: 'gantt.task',
+                method: 'get_gantt_facets',
+                kwargs: {
+                    wbs_root: this.portfolioMode ? null : this.wbs_root,
+                    filters: this.filters,
+                },
+            }).then((facets) => {
+                this._renderFacets(facets);
             }).catch((error) => {
-                console.error('Error fetching tasks:', error);
+                console.error('Error loading filter facets:', error);
             });
         },
 
+        _renderFacets: function (facets) {
+            const bar = this.$('.gantt-filter-bar');
+            const fillSelect = (select, emptyLabel, options) => {
+                const current = select.val();
+                select.empty().append($('<option>').val('').text(emptyLabel));
+                options.forEach(option => {
+                    select.append($('<option>').val(option.value).text(`${option.label} (${option.count})`));
+                });
+                select.val(current);
+            };
+            fillSelect(bar.find('.filter-lead'), 'All assignees',
+                facets.lead.map(lead => ({ value: lead.id || 0, label: lead.name, count: lead.count })));
+            fillSelect(bar.find('.filter-priority'), 'All priorities', facets.priority);
+            fillSelect(bar.find('.filter-progress'), 'Any progress', facets.progress_bucket);
+            const delayed = facets.delayed.find(option => option.value === true);
+            bar.find('.filter-delayed-count').text(`(${delayed ? delayed.count : 0})`);
+            bar.find('.filter-total').text(`${facets.total} tasks`);
+        },
+
+        _renderPortfolioTable: function (projects) {
+            const listContainer = this.$('.left-panel .list-container');
+            let listHtml = `
+                <div class="task-list">
+                    <div class="task-list-header">
+                        <h4>Portfolio</h4>
+                        <span class="badge badge-info">${projects.length} projects</span>
+                        ${projects.length ? `
+                        <button class="btn btn-sm btn-secondary export-all-btn" title="Export the listed projects as one ZIP">
+                            <i class="fa fa-file-archive-o"></i> Export All
+                        </button>` : ''}
+                    </div>
+                    <div class="task-table-container">
+                        <table class="task-table">
+                            <thead>
+                                <tr>
+                                    <th>WBS</th>
+                                    <th>PROJECT</th>
+                                    <th>START</th>
+                                    <th>END</th>
+                                    <th>TASKS</th>
+                                    <th>DELAYED</th>
+                                    <th>PROGRESS</th>
+                                </tr>
+                            </thead>
+                            <tbody>
+            `;
+            projects.forEach(project => {
+                listHtml += `
+                    <tr class="task-row portfolio-row" data-wbs-root="${project.wbs_root}">
+                        <td>${project.wbs_root}</td>
+                        <td>${_.escape(project.name)}</td>
+                        <td>${this._formatDate(project.start_date)}</td>
+                        <td>${this._formatDate(project.end_date)}</td>
+                        <td>${project.match_count !== undefined ? `${project.match_count}/${project.task_count}` : project.task_count}</td>
+                        <td>${project.delayed_count}</td>
+                        <td>${Math.round(project.progress)}%</td>
+                    </tr>
+                `;
+            });
+            listHtml += `
+                            </tbody>
+                        </table>
+                    </div>
+                </div>
+            `;
+            listContainer.html(listHtml);
+        },
+
+        _renderPortfolioGantt: function () {
+            const bars = this.availableProjects
+                .filter(project => this._isValidDate(project.start_date) && this._isValidDate(project.end_date))
+                .map(project => ({
+                    id: `root-${project.wbs_root}`,
+                    name: `${project.wbs_root}: ${project.name}`,
+                    start: project.start_date,
+                    end: project.end_date,
+                    progress: project.progress || 0,
+                    dependencies: [],
+                    custom_class: `portfolio-bar wbs-group-${project.wbs_root}${project.delayed_count ? ' portfolio-delayed' : ''}`,
+                    portfolio: project,
+                }));
+
+            if (!bars.length) {
+                this._showGanttError('No projects found.');
+                return;
+            }
+            this._createGanttChart(bars);
+            this._changeViewMode('Month');
+        },
+
+        _drillIntoProject: function (wbsRoot) {
+            this.portfolioMode = false;
+            this._switchToProject(String(wbsRoot));
+        },
+
         _renderTaskList: function (records) {
             const listContainer = this.$('.left-panel .list-container');
 
-            // If we're in project-specific mode, show simplified task list
-            if (this.wbs_root && this.action.context && this.action.context.default_wbs_root) {
+            // A single project is loaded, show its task table
+            if (this.wbs_root && !this.portfolioMode) {
                 this._renderProjectTaskTable(records);
                 return;
             }
@@ -365,6 +435,9 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
                     <div class="task-list-header">
                         <h4>${this.project_name}</h4>
                         <div class="project-actions">
+                            <button class="btn btn-sm btn-secondary portfolio-btn" title="Portfolio Overview">
+                                <i class="fa fa-th-list"></i>
+                            </button>
                             <button class="btn btn-sm btn-success project-selector-btn" title="Switch Project">
                                 <i class="fa fa-exchange"></i>
                             </button>
@@ -467,7 +540,7 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
 
             $('.project-item').on('click', (e) => {
                 const wbsRoot = $(e.currentTarget).data('wbs-root');
-                this._switchToProject(wbsRoot);
+                this._drillIntoProject(wbsRoot);
                 $('.project-selector-modal').remove();
             });
         },
@@ -536,7 +609,7 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
             const progress = record.progress || 0;
 
             return `
-                <tr class="task-row" data-task-id="${record.id}">
+                <tr class="task-row${record.filter_context ? ' filter-context' : ''}" data-task-id="${record.id}">
                     <td class="wbs-cell">
                         ${record.wbs}
                     </td>
@@ -577,28 +650,35 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
 
             let inputElement;
             if (field === 'lead') {
-                // Create dropdown for assignee with dynamic user list
+                // Create dropdown for assignee from the cached user directory
                 inputElement = $('<select>');
-                inputElement.append('<option value="Unassigned">Unassigned</option>');
-
-                // Load users dynamically
-                this._rpc({
-                    model: 'res.users',
-                    method: 'search_read',
-                    args: [[], ['name']],
-                }).then((users) => {
-                    users.forEach(user => {
-                        const selected = user.name === originalValue ? 'selected' : '';
-                        inputElement.append(`<option value="${user.name}" ${selected}>${user.name}</option>`);
+                inputElement.append('<option value="">Unassigned</option>');
+                const currentLeadId = task.lead && Array.isArray(task.lead) ? task.lead[0] : false;
+
+                this._loadUserDirectory().then((directory) => {
+                    const users = directory.users.slice();
+                    // Keep the current assignee selectable even when it is beyond the first page
+                    if (currentLeadId && !users.some(user => user[0] === currentLeadId)) {
+                        users.unshift(task.lead);
+                    }
+                    users.forEach(([userId, userName]) => {
+                        const option = $('<option>').val(userId).text(userName);
+                        if (userId === currentLeadId) {
+                            option.prop('selected', true);
+                        }
+                        inputElement.append(option);
                     });
+                    if (directory.has_more) {
+                        inputElement.append('<option value="__search__">Search more...</option>');
+                    }
                 }).catch((error) => {
                     console.error('Error loading users:', error);
-                    // Fallback to static list
-                    const assignees = ['Akshat', 'Sagar', 'Administrator', 'Balaji'];
-                    assignees.forEach(assignee => {
-                        const selected = assignee === originalValue ? 'selected' : '';
-                        inputElement.append(`<option value="${assignee}" ${selected}>${assignee}</option>`);
-                    });
+                });
+
+                inputElement.on('change', () => {
+                    if (inputElement.val() === '__search__') {
+                        this._searchAssignee(inputElement, task);
+                    }
                 });
 
             } else if (field === 'start_date' || field === 'end_date') {
@@ -658,103 +738,102 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
         _saveEdit: function(cell, inputElement, task, field) {
             const newValue = inputElement.val();
 
+            // Ignore the blur that follows an Enter-triggered save
+            if (!cell.hasClass('edit-mode')) return;
+
             // Handle lead field separately since it's a Many2one relation
             if (field === 'lead') {
-                this._updateLeadField(cell, newValue, task);
+                if (newValue === '__search__') return;
+                const leadName = inputElement.find('option:selected').text();
+                cell.removeClass('edit-mode');
+                this._updateLeadField(cell, newValue, leadName, task);
                 return;
             }
 
-            // Prepare the update data for other fields
             const updateData = {};
-            if (field === 'start_date' || field === 'end_date') {
-                updateData[field] = newValue;
-            } else if (field === 'progress') {
+            if (field === 'progress') {
                 updateData[field] = parseInt(newValue) || 0;
             } else {
                 updateData[field] = newValue;
             }
 
-            // Update in Odoo
-            this._rpc({
-                model: 'gantt.task',
-                method: 'write',
-                args: [task.id, updateData],
-            }).then(() => {
-                console.log('Task updated successfully');
-
-                // Update local data
-                task[field] = updateData[field];
+            // Apply locally straight away; the server write is queued and rolled back on failure
+            cell.removeClass('edit-mode');
+            this._applyTaskChange(task.id, updateData);
+            this._queueTaskWrite(task.id, updateData);
+        },
 
-                // Update display
-                let displayValue = newValue;
-                if (field === 'start_date' || field === 'end_date') {
-                    displayValue = this._formatDate(newValue);
-                } else if (field === 'progress') {
-                    displayValue = newValue + '%';
+        _loadUserDirectory: function () {
+            // Reuse the list without a round trip when it was checked recently
+            if (this.userDirectory && Date.now() - this.userDirectory.checkedAt < USER_DIRECTORY_CHECK_INTERVAL) {
+                return Promise.resolve(this.userDirectory);
+            }
+            // Send our revision so the server can skip the payload when nothing changed
+            return this._rpc({
+                model: 'gantt.task',
+                method: 'get_assignee_directory',
+                kwargs: {
+                    revision: this.userDirectory ? this.userDirectory.revision : null,
+                },
+            }).then((result) => {
+                if (!result.unchanged || !this.userDirectory) {
+                    this.userDirectory = {
+                        revision: result.revision,
+                        users: result.users || [],
+                        has_more: result.has_more,
+                    };
                 }
+                this.userDirectory.checkedAt = Date.now();
+                return this.userDirectory;
+            });
+        },
 
-                cell.html(displayValue);
-                cell.removeClass('edit-mode');
-
-                // Refresh Gantt chart if dates or progress changed
-                if (field === 'start_date' || field === 'end_date' || field === 'progress') {
-                    this._renderGanttWithFilteredTasks();
+        _searchAssignee: function (inputElement, task) {
+            const query = prompt('Search assignee by name:');
+            if (!query) {
+                inputElement.val(task.lead ? task.lead[0] : '');
+                return;
+            }
+            this._rpc({
+                model: 'gantt.task',
+                method: 'get_assignee_directory',
+                kwargs: { query: query },
+            }).then((result) => {
+                inputElement.find('option.search-result').remove();
+                (result.users || []).forEach(([userId, userName]) => {
+                    const option = $('<option class="search-result">').val(userId).text(userName);
+                    inputElement.find('option[value="__search__"]').before(option);
+                });
+                if (result.users && result.users.length) {
+                    inputElement.val(result.users[0][0]);
                 }
-
+                inputElement.focus();
             }).catch((error) => {
-                console.error('Error updating task:', error);
-                alert('Error updating task: ' + error.message);
-                this._cancelEdit(cell, this._getFieldValue(task, field));
+                console.error('Error searching users:', error);
             });
         },
 
-        // ADD this new method to handle lead field updates:
-
-        _updateLeadField: function(cell, newValue, task) {
-            if (newValue === 'Unassigned') {
-                // Set lead to false/null for unassigned
-                this._rpc({
-                    model: 'gantt.task',
-                    method: 'write',
-                    args: [task.id, { lead: false }],
-                }).then(() => {
-                    console.log('Lead updated to unassigned');
-                    task.lead = false;
-                    cell.html('Unassigned');
-                    cell.removeClass('edit-mode');
-                }).catch((error) => {
-                    console.error('Error updating lead:', error);
-                    alert('Error updating lead: ' + error.message);
-                    this._cancelEdit(cell, this._getFieldValue(task, 'lead'));
-                });
-            } else {
-                // Search for user by name and get their ID
-                this._rpc({
-                    model: 'res.users',
-                    method: 'search',
-                    args: [[['name', '=', newValue]]],
-                }).then((userIds) => {
-                    if (userIds.length > 0) {
-                        const userId = userIds[0];
-                        return this._rpc({
-                            model: 'gantt.task',
-                            method: 'write',
-                            args: [task.id, { lead: userId }],
-                        }).then(() => {
-                            console.log('Lead updated successfully');
-                            task.lead = [userId, newValue];
-                            cell.html(newValue);
-                            cell.removeClass('edit-mode');
-                        });
-                    } else {
-                        throw new Error(`User "${newValue}" not found`);
-                    }
-                }).catch((error) => {
-                    console.error('Error updating lead:', error);
-                    alert('Error updating lead: ' + error.message);
-                    this._cancelEdit(cell, this._getFieldValue(task, 'lead'));
-                });
+        _updateLeadField: function(cell, newValue, leadName, task) {
+            // Write the lead by id in a single call; an empty value unassigns the task
+            const userId = parseInt(newValue) || false;
+            const currentLeadId = task.lead && Array.isArray(task.lead) ? task.lead[0] : false;
+            if (userId === currentLeadId) {
+                this._cancelEdit(cell, this._getFieldValue(task, 'lead'));
+                return;
             }
+            this._rpc({
+                model: 'gantt.task',
+                method: 'write',
+                args: [task.id, { lead: userId }],
+            }).then(() => {
+                console.log('Lead updated successfully');
+                task.lead = userId ? [userId, leadName] : false;
+                cell.text(userId ? leadName : 'Unassigned');
+            }).catch((error) => {
+                console.error('Error updating lead:', error);
+                alert('Error updating lead: ' + error.message);
+                this._cancelEdit(cell, this._getFieldValue(task, 'lead'));
+            });
         },
 
         _cancelEdit: function(cell, originalValue) {
@@ -1198,11 +1277,39 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
 //                });
 //            });
 
+            this.$('.left-panel').on('click', '.portfolio-btn', (e) => {
+                e.preventDefault();
+                this._showPortfolio();
+            });
+
+            this.$('.left-panel').on('click', '.portfolio-row', (e) => {
+                e.preventDefault();
+                this._drillIntoProject($(e.currentTarget).data('wbs-root'));
+            });
+
+            this.$('.gantt-filter-bar').off();
+            this.$('.gantt-filter-bar').on('change', 'select, .filter-delayed', () => this._onFiltersChanged());
+            this.$('.gantt-filter-bar').on('input', '.filter-search',
+                _.debounce(() => this._onFiltersChanged(), SEARCH_DEBOUNCE_DELAY));
+            this.$('.gantt-filter-bar').on('click', '.filter-clear', (e) => {
+                e.preventDefault();
+                this._clearFilters();
+            });
+
+            this.$el.on('click', '.refresh-btn', (e) => {
+                e.preventDefault();
+                this._refreshData();
+            });
+
             this.$('.left-panel').on('click', '.export-btn', (e) => {
                 e.preventDefault();
                 const wbsRoot = $(e.currentTarget).data('wbs-root');
                 this._exportProjectTasks(wbsRoot);
             });
+            this.$('.left-panel').on('click', '.export-all-btn', (e) => {
+                e.preventDefault();
+                this._exportAllProjects();
+            });
             // Project title click events - Only if not in project-specific mode
             if (!this.action.context || !this.action.context.default_wbs_root) {
                 this.$('.left-panel').on('click', '.project-title', (e) => {
@@ -1352,12 +1459,11 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
         },
 
         _refreshData: function () {
-            if (this.wbs_root && this.action.context && this.action.context.default_wbs_root) {
+            if (this.wbs_root && !this.portfolioMode) {
                 // Refresh data for specific project
                 this._loadTasksForProject(this.wbs_root);
             } else {
-                // Refresh all data
-                this._setupListView();
+                this._loadAllProjects().then(() => this._showPortfolio());
             }
         },
 
@@ -1498,7 +1604,7 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
                 const container = this.$('#gantt-chart');
                 container.empty();
 
-                this.gantt = new Gantt('#gantt-chart', tasks, {
+                this.gantt = new window.Gantt('#gantt-chart', tasks, {
                     header_height: 50,
                     column_width: 30,
                     step: 24,
@@ -1514,6 +1620,9 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
                         if (!task) {
                             return '<div class="details-container"><p>Invalid task data</p></div>';
                         }
+                        if (task.portfolio) {
+                            return this._renderPortfolioPopup(task.portfolio);
+                        }
 
                         const name = task.name || 'Unnamed Task';
                         const end = task.end || 'Not set';
@@ -1568,26 +1677,52 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
 //            setTimeout(() => this._refreshData(), 2000);
 //        },
 
+        _renderPortfolioPopup: function (project) {
+            // Busiest months of the project, from the server-side monthly buckets
+            const months = (project.months || []).slice()
+                .sort((a, b) => b.active_tasks - a.active_tasks)
+                .slice(0, 3);
+            const monthLines = months.map(bucket =>
+                `<p>${bucket.month.slice(0, 7)}: ${bucket.active_tasks} active tasks</p>`
+            ).join('');
+            return `
+                <div class="details-container">
+                    <h5>${_.escape(project.name)}</h5>
+                    <p>${project.task_count} tasks, ${project.delayed_count} delayed</p>
+                    <p>Progress: ${Math.round(project.progress)}%</p>
+                    ${monthLines}
+                    <p><em>Click to open the project</em></p>
+                </div>
+            `;
+        },
+
+        _onTaskClick: function (task) {
+            if (!task || !task.id) return;
+            if (task.portfolio) {
+                this._drillIntoProject(task.portfolio.wbs_root);
+                return;
+            }
+            this._highlightTask(parseInt(task.id));
+        },
+
         _onDateChange: function (task, start, end) {
             if (!task || !task.id) {
                 console.error('Invalid task for date change:', task);
                 return;
             }
+            if (this.portfolioMode) {
+                // Summary bars are read-only, snap them back
+                this._renderPortfolioGantt();
+                return;
+            }
 
-            const startDate = this._formatDateForOdoo(start);
-            const endDate = this._formatDateForOdoo(end);
-
-            this._rpc({
-                model: 'gantt.task',
-                method: 'write',
-                args: [parseInt(task.id), { start_date: startDate, end_date: endDate }],
-            }).then(() => {
-                console.log('Task dates updated successfully');
-                this._refreshData();
-            }).catch((error) => {
-                console.error('Error updating task dates:', error);
-                this._renderGanttWithFilteredTasks();
-            });
+            // The bar is already in place after the drag, only sync data and the row
+            const vals = {
+                start_date: this._formatDateForOdoo(start),
+                end_date: this._formatDateForOdoo(end),
+            };
+            this._applyTaskChange(parseInt(task.id), vals, { skipBar: true });
+            this._queueTaskWrite(parseInt(task.id), vals);
         },
 
         _onProgressChange: function (task, progress) {
@@ -1595,24 +1730,210 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
                 console.error('Invalid task for progress change:', task);
                 return;
             }
-            console.log('Updating progress for task', task.id, 'to', progress);
+            if (this.portfolioMode) {
+                this._renderPortfolioGantt();
+                return;
+            }
 
-            this._rpc({
+            const vals = { progress: progress };
+            this._applyTaskChange(parseInt(task.id), vals, { skipBar: true });
+            this._queueTaskWrite(parseInt(task.id), vals);
+        },
+
+        _findTask: function (taskId) {
+            return this.allTasks.find(t => t.id === taskId);
+        },
+
+        _applyTaskChange: function (taskId, vals, options) {
+            const task = this._findTask(taskId);
+            if (!task) return;
+
+            // Remember what the server has for each field before its first unconfirmed change
+            if (!this.confirmedValues.has(taskId)) {
+                this.confirmedValues.set(taskId, {});
+            }
+            const confirmed = this.confirmedValues.get(taskId);
+            Object.keys(vals).forEach(field => {
+                if (!(field in confirmed)) {
+                    confirmed[field] = task[field];
+                }
+            });
+
+            Object.assign(task, vals);
+            if (vals.start_date) task.start = vals.start_date;
+            if (vals.end_date) task.end = vals.end_date;
+            if (vals.start_date || vals.end_date) {
+                task.duration = this._computeDuration(task.start_date, task.end_date);
+            }
+
+            this._updateTaskRow(task);
+            if (!(options && options.skipBar)) {
+                this._updateBarInPlace(task);
+            }
+        },
+
+        _queueTaskWrite: function (taskId, vals) {
+            // Successive changes to the same task are merged into a single write
+            let pending = this.pendingWrites.get(taskId);
+            if (!pending) {
+                pending = { vals: {}, timer: null };
+                this.pendingWrites.set(taskId, pending);
+            }
+            Object.assign(pending.vals, vals);
+            clearTimeout(pending.timer);
+            pending.timer = setTimeout(() => this._flushTaskWrite(taskId), WRITE_COALESCE_DELAY);
+        },
+
+        _flushTaskWrite: function (taskId) {
+            const pending = this.pendingWrites.get(taskId);
+            if (!pending) return;
+            this.pendingWrites.delete(taskId);
+
+            // Writes for one task are chained so they reach the server in order.
+            // A chained write is sent once, when the previous one is done or on destroy.
+            let request = null;
+            const send = () => {
+                if (!request) {
+                    this.waitingSends.delete(send);
+                    request = this._rpc({
+                        model: 'gantt.task',
+                        method: 'write',
+                        args: [taskId, pending.vals],
+                        // Bulk mode: no per-record chatter or tracking for interactive edits
+                        context: { gantt_bulk_mode: true },
+                    });
+                }
+                return request;
+            };
+            const previous = this.writeChains.get(taskId);
+            if (previous) {
+                this.waitingSends.add(send);
+            }
+            const chain = (previous ? previous.then(send) : send()).then(() => {
+                const confirmed = this.confirmedValues.get(taskId);
+                if (confirmed) {
+                    Object.assign(confirmed, pending.vals);
+                }
+                if ('start_date' in pending.vals || 'end_date' in pending.vals) {
+                    return this._syncTaskDuration(taskId);
+                }
+            }).catch((error) => {
+                console.error('Error updating task:', error);
+                this._rollbackTask(taskId, pending.vals);
+                const message = error && error.message && error.message.data ? error.message.data.message : error.message;
+                this.displayNotification({
+                    title: 'Update failed',
+                    message: message || 'The change could not be saved and was reverted.',
+                    type: 'danger',
+                });
+            }).finally(() => {
+                if (this.writeChains.get(taskId) === chain) {
+                    this.writeChains.delete(taskId);
+                    if (!this.pendingWrites.has(taskId)) {
+                        this.confirmedValues.delete(taskId);
+                    }
+                }
+            });
+            this.writeChains.set(taskId, chain);
+            return chain;
+        },
+
+        _syncTaskDuration: function (taskId) {
+            // Durations follow the task's working calendar, so take the server's value
+            return this._rpc({
                 model: 'gantt.task',
-                method: 'write',
-                args: [parseInt(task.id), { progress: progress }],
-            }).then(() => {
-                console.log('Task progress updated successfully');
-                this._refreshData();
+                method: 'read',
+                args: [[taskId], ['duration']],
+            }).then((records) => {
+                const task = this._findTask(taskId);
+                if (task && records.length) {
+                    task.duration = records[0].duration;
+                    this._updateTaskRow(task);
+                }
             }).catch((error) => {
-                console.error('Error updating task progress:', error);
-                this._renderGanttWithFilteredTasks();
+                console.error('Error reading task duration:', error);
+            });
+        },
+
+        _rollbackTask: function (taskId, failedVals) {
+            const confirmed = this.confirmedValues.get(taskId);
+            if (!confirmed) return;
+
+            // Only revert fields that no newer queued change has overwritten
+            const pending = this.pendingWrites.get(taskId);
+            const restore = {};
+            Object.keys(failedVals).forEach(field => {
+                if (!(pending && field in pending.vals) && field in confirmed) {
+                    restore[field] = confirmed[field];
+                }
             });
+            if (Object.keys(restore).length) {
+                this._applyTaskChange(taskId, restore);
+            }
+        },
+
+        _updateTaskRow: function (task) {
+            const row = this.$('.left-panel .task-row[data-task-id="' + task.id + '"]');
+            if (!row.length) return;
+            row.find('.name-cell').text(task.name);
+            row.find('.start-cell').text(this._formatDate(task.start_date));
+            row.find('.end-cell').text(this._formatDate(task.end_date));
+            row.find('.duration-cell').text(task.duration || 'N/A');
+            row.find('.progress-cell').text((task.progress || 0) + '%');
+        },
+
+        _updateBarInPlace: function (task) {
+            // Reposition a single bar and its arrows instead of redrawing the chart
+            const bar = this.gantt && this.gantt.get_bar(task.id.toString());
+            if (!bar) return;
+
+            const start = task.start_date || task.start;
+            const end = task.end_date || task.end;
+            if (!this._isValidDate(start) || !this._isValidDate(end)) return;
+
+            const { step, column_width } = this.gantt.options;
+            bar.task.name = `${task.wbs}: ${task.name}`;
+            bar.task.start = start;
+            bar.task.end = end;
+            bar.task.progress = task.progress || 0;
+            bar.task._start = this._parseLocalDate(start);
+            // Frappe treats the end date as inclusive of the whole day
+            bar.task._end = this._parseLocalDate(end);
+            bar.task._end.setDate(bar.task._end.getDate() + 1);
+
+            bar.x = bar.compute_x();
+            bar.duration = (bar.task._end - bar.task._start) / 3600000 / step;
+            bar.width = column_width * bar.duration;
+            bar.$bar.setAttribute('x', bar.x);
+            bar.$bar.setAttribute('width', bar.width);
+
+            const label = bar.group.querySelector('.bar-label');
+            if (label) {
+                label.textContent = bar.task.name;
+            }
+            bar.update_label_position();
+            bar.update_handle_position();
+            bar.update_progressbar_position();
+            bar.update_arrow_position();
+        },
+
+        _parseLocalDate: function (dateStr) {
+            const [year, month, day] = dateStr.split('-').map(Number);
+            return new Date(year, month - 1, day);
+        },
+
+        _computeDuration: function (startDate, endDate) {
+            if (!this._isValidDate(startDate) || !this._isValidDate(endDate)) return 0;
+            const days = Math.round((this._parseLocalDate(endDate) - this._parseLocalDate(startDate)) / 86400000);
+            return days + 1;
         },
 
         _formatDateForOdoo: function (date) {
             if (date instanceof Date) {
-                return date.toISOString().split('T')[0];
+                // Use local date parts, toISOString would shift the day east of UTC
+                const month = (date.getMonth() + 1).toString().padStart(2, '0');
+                const day = date.getDate().toString().padStart(2, '0');
+                return `${date.getFullYear()}-${month}-${day}`;
             }
             return date;
         },
@@ -1683,18 +2004,7 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
             // Create the Excel with colored Gantt chart
             const createGanttExcel = async () => {
                 try {
-                    if (typeof ExcelJS === 'undefined') {
-                        const loadExcelJS = this._loadExcelJS || function() {
-                            return new Promise((resolve, reject) => {
-                                const script = document.createElement('script');
-                                script.src = 'https://cdnjs.cloudflare.com/ajax/libs/exceljs/4.3.0/exceljs.min.js';
-                                script.onload = () => resolve();
-                                script.onerror = () => reject(new Error('Failed to load ExcelJS'));
-                                document.head.appendChild(script);
-                            });
-                        };
-                        await loadExcelJS();
-                    }
+                    const ExcelJS = await this._loadExportLib('ExcelJS');
 
                     const { projectStart, projectEnd } = calculateProjectDates();
                     const dateColumns = generateDateColumns(projectStart, projectEnd);
@@ -1763,7 +2073,7 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
 
                     // Save Excel
                     const buffer = await workbook.xlsx.writeBuffer();
-                    saveAs(new Blob([buffer]), `Project_${wbsRoot}_GanttChart.xlsx`);
+                    this._downloadBlob(new Blob([buffer]), `Project_${wbsRoot}_GanttChart.xlsx`);
 
                     alert(`Gantt chart exported successfully!\n\nProject: ${wbsRoot}\nDate range: ${projectStart.toLocaleDateString()} to ${projectEnd.toLocaleDateString()}\nTotal days: ${dateColumns.length}\nTasks: ${tasks.length}`);
 
@@ -1777,8 +2087,65 @@ odoo.define('dynamic_gantt_frappe.combined_widget', function (require) {
             createGanttExcel();
         },
 
+        _exportAllProjects: function () {
+            // Workbooks are built server-side as a background job, the ZIP is attached to the job
+            // The portfolio rows are the projects matching the current filters
+            const wbsRoots = this.$('.left-panel .portfolio-row').map((i, el) => String($(el).data('wbs-root'))).get();
+            if (!wbsRoots.length) {
+                alert('No projects to export.');
+                return;
+            }
+            this._rpc({
+                model: 'gantt.task',
+                method: 'export_projects',
+                args: [wbsRoots],
+            }).then((action) => {
+                this.do_action(action);
+            }).catch((error) => {
+                alert('Error starting the export: ' + error.message);
+            });
+        },
+
+        _loadExportLib: function (globalName) {
+            if (window[globalName]) {
+                return Promise.resolve(window[globalName]);
+            }
+            const urls = EXPORT_LIBS[globalName];
+            const tryUrl = (index) => {
+                if (index >= urls.length) {
+                    return Promise.reject(new Error(`${globalName} could not be loaded from ${urls.join(' or ')}`));
+                }
+                return ajax.loadJS(urls[index]).then(() => {
+                    if (!window[globalName]) {
+                        throw new Error();
+                    }
+                    return window[globalName];
+                }).catch(() => tryUrl(index + 1));
+            };
+            return tryUrl(0);
+        },
+
+        _downloadBlob: function (blob, filename) {
+            const url = URL.createObjectURL(blob);
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = filename;
+            document.body.appendChild(link);
+            link.click();
+            link.remove();
+            setTimeout(() => URL.revokeObjectURL(url), 0);
+        },
+
 
         destroy: function () {
+            // Send any queued edits before the widget goes away, in this tick:
+            // once destroyed, _rpc no longer dispatches
+            Array.from(this.pendingWrites.keys()).forEach(taskId => {
+                clearTimeout(this.pendingWrites.get(taskId).timer);
+                this._flushTaskWrite(taskId);
+            });
+            // Including those chained behind a write in flight, in the order they were queued
+            Array.from(this.waitingSends).forEach(send => send());
             if (this.gantt) {
                 this.gantt = null;
             }
@@ -3,16 +3,26 @@ odoo.define('dynamic_gantt_frappe.gantt_widget', function (require) {
 
     const AbstractAction = require('web.AbstractAction');
     const core = require('web.core');
-    const { Gantt } = window;  // Frappe Gantt is loaded globally
+    const ajax = require('web.ajax');
 
     const FrappeGanttAction = AbstractAction.extend({
         template: 'FrappeGanttWidget',
+        // Frappe Gantt is loaded when the action opens, not with every backend page
+        jsLibs: ['/gantt_chart/static/src/lib/frappe-gantt.min.js'],
+        cssLibs: [
+            '/gantt_chart/static/src/lib/frappe-gantt.css',
+            '/gantt_chart/static/src/css/combined_gantt.css',
+        ],
 
         init: function () {
             this._super.apply(this, arguments);
             this.gantt = null;
         },
 
+        willStart: function () {
+            return Promise.all([this._super.apply(this, arguments), ajax.loadLibs(this)]);
+        },
+
         start: function () {
             return this._super().then(() => {
                 this._renderGantt();
@@ -115,7 +125,7 @@ odoo.define('dynamic_gantt_frappe.gantt_widget', function (require) {
                 const container = this.$('#gantt-chart');
                 container.empty();
 
-                this.gantt = new Gantt('#gantt-chart', tasks, {
+                this.gantt = new window.Gantt('#gantt-chart', tasks, {
                     header_height: 50,
                     column_width: 30,
                     step: 24,
@@ -204,6 +214,8 @@ odoo.define('dynamic_gantt_frappe.gantt_widget', function (require) {
                     start_date: startDate,
                     end_date: endDate
                 }],
+                // Bulk mode: no per-record chatter or tracking for drag edits
+                context: { gantt_bulk_mode: true },
             }).then(() => {
                 console.log('Task dates updated successfully');
             }).catch((error) => {
@@ -224,6 +236,7 @@ odoo.define('dynamic_gantt_frappe.gantt_widget', function (require) {
                 args: [parseInt(task.id), {
                     progress: progress
                 }],
+                context: { gantt_bulk_mode: true },
             }).then(() => {
                 console.log('Task progress updated successfully');
             }).catch((error) => {